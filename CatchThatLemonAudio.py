@@ -0,0 +1,182 @@
+"""
+Catch That Lemon sound: background music and sound effects through pygame.mixer.
+pygame.mixer.init() has to be called before a SoundBank is made.
+"""
+
+import queue
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+# ==================================================================================
+# Music
+# ==================================================================================
+
+
+MENU_MUSIC = "sounds/Menu_Music.mp3"
+GAME_MUSIC = "sounds/Game_BGM2.wav"
+MUSIC_FADE_MS = 400
+
+
+class MusicManager:
+    """
+    Remembers which background track is loaded and whether it is playing.
+    Asking for the track that is already playing does nothing, so menus can
+    call play() on every redraw without reopening and decoding the file.
+    """
+
+    def __init__(self):
+        self.track = None
+        self.playing = False
+        self.volume = 1.0
+
+    def set_volume(self, volume):
+        self.volume = volume
+        pygame.mixer.music.set_volume(volume)
+
+    def play(self, filename, fade_ms=MUSIC_FADE_MS):
+        if filename == self.track and self.playing:
+            return
+
+        # pygame streams one music track at a time, so a switch fades the new one in
+        if not self.playing:
+            fade_ms = 0
+        pygame.mixer.music.load(filename)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(-1, fade_ms=fade_ms)
+        self.track = filename
+        self.playing = True
+
+    def stop(self):
+        if self.playing:
+            pygame.mixer.music.stop()
+        self.playing = False
+
+
+# ==================================================================================
+# Sound Effects
+# ==================================================================================
+
+
+SFX_FILES = (
+    "sounds/Bite.wav",
+    "sounds/Plop.wav",
+    "sounds/Blegh.wav",
+    "sounds/Hmmm.wav",
+    "sounds/Death.wav",
+)
+SFX_CHANNELS = 8
+SFX_MAX_BYTES = 32 * 1024 * 1024
+
+
+class SoundBank:
+    """
+    Decodes every sound effect once and keeps it in memory. When the bank grows
+    past `max_bytes` the least recently played sound is dropped.
+    Sounds play on a fixed pool of mixer channels; when every channel is busy
+    the one that started longest ago is taken over.
+
+    preload_in_background() decodes on a worker thread, which hands every
+    finished Sound to the main thread through the `ready` queue. A sound
+    played before it is ready is skipped, never waited for.
+    """
+
+    def __init__(self, max_bytes=SFX_MAX_BYTES, channels=SFX_CHANNELS):
+        self.sounds = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.max_bytes = max_bytes
+
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.started = [0] * channels
+        self.plays = 0
+
+        self.ready = queue.Queue()   # (filename, Sound or None) from the loader thread
+        self.loading = set()         # filenames the loader thread has not handed over yet
+
+    def preload_in_background(self, filenames):
+        filenames = [f for f in filenames if f not in self.sounds and f not in self.loading]
+        self.loading.update(filenames)
+        threading.Thread(target=self.decode_all, args=(filenames,),
+                         name="sound-loader", daemon=True).start()
+
+    def decode_all(self, filenames):
+        # Loader thread: only decodes, the bank itself is only touched on the main thread
+        for filename in filenames:
+            self.ready.put((filename, decode_sound(filename)))
+
+    def collect(self):
+        """Take in the sounds the loader thread finished."""
+        while True:
+            try:
+                filename, sound = self.ready.get_nowait()
+            except queue.Empty:
+                return
+            self.loading.discard(filename)
+            if sound is not None and filename not in self.sounds:
+                self.add(filename, sound)
+
+    def load(self, filename):
+        if filename in self.sounds:
+            self.sounds.move_to_end(filename)
+            return self.sounds[filename]
+
+        sound = decode_sound(filename)
+        if sound is not None:
+            self.add(filename, sound)
+        return sound
+
+    def add(self, filename, sound):
+        size = sound_size(sound)
+        self.sounds[filename] = sound
+        self.sizes[filename] = size
+        self.total_bytes += size
+
+        # Keep at least the sound we just added
+        while self.total_bytes > self.max_bytes and len(self.sounds) > 1:
+            old, _ = self.sounds.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(old)
+
+    def free_channel(self):
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+        # Voice stealing: take over the oldest sound still playing
+        return min(range(len(self.channels)), key=self.started.__getitem__)
+
+    def play(self, filename, volume=1.0):
+        if self.loading:
+            self.collect()
+        sound = self.sounds.get(filename)
+        if sound is None:
+            if filename in self.loading:
+                return   # still decoding; this one goes silent
+            sound = self.load(filename)
+            if sound is None:
+                return
+        else:
+            self.sounds.move_to_end(filename)
+
+        i = self.free_channel()
+        self.plays += 1
+        self.started[i] = self.plays
+        channel = self.channels[i]
+        channel.set_volume(volume)
+        channel.play(sound)
+
+
+def decode_sound(filename):
+    try:
+        return pygame.mixer.Sound(filename)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Warning: could not load sound '{filename}': {e}")
+        return None
+
+
+def sound_size(sound):
+    """Decoded size in bytes, worked out from the mixer format instead of copying the samples."""
+    frequency, size_bits, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency) * channels * (abs(size_bits) // 8)
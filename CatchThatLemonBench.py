@@ -0,0 +1,305 @@
+"""
+Benchmarks for the hot paths of Catch That Lemon, run without a window.
+
+    python CatchThatLemonBench.py                       # print timings
+    python CatchThatLemonBench.py --save baseline.json  # keep them for later
+    python CatchThatLemonBench.py --compare baseline.json
+
+Every benchmark runs a fixed batch of operations several times and reports the
+time per operation. Compare the medians between releases; a change beyond
+--threshold percent is flagged.
+"""
+
+import argparse
+import atexit
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from CatchThatLemonCore import BodySprites, Camera, GameModel
+
+# Save files go to a throwaway folder, never to the player's real ones.
+# This has to happen before CatchThatLemonSave picks its paths on import.
+# The folder is removed again when the benchmarks exit.
+save_dir = tempfile.TemporaryDirectory(prefix="ctl-bench-")
+atexit.register(save_dir.cleanup)
+os.environ["APPDATA"] = save_dir.name
+
+import CatchThatLemonSave as save
+
+
+REPEATS = 7
+SNAKE_LENGTHS = (10, 100, 1000, 10000)
+FILL_LEVELS = (0.0, 0.5, 0.9, 0.99)
+STEPS_PER_SNAKE = 30   # straight moves a laid out snake can make before hitting the border
+SNAKES_PER_RUN = 10
+
+
+# ==================================================================================
+# Timing
+# ==================================================================================
+
+
+def measure(run, repeats=REPEATS):
+    """
+    Call run() `repeats` times after one warm up call. run() sets up its own
+    state, times only the work and returns (seconds, operations).
+    Returns microseconds per operation for every repeat.
+    """
+    run()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            seconds, ops = run()
+            samples.append(seconds / ops * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def summary(samples):
+    return {
+        "min_us": min(samples),
+        "median_us": statistics.median(samples),
+        "mean_us": statistics.fmean(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+# ==================================================================================
+# Fixtures
+# ==================================================================================
+
+
+class NullSprite:
+    """Stands in for a turtle, so only the bookkeeping is timed."""
+
+    __slots__ = ("pos", "shape")
+
+    def goto(self, pos):
+        self.pos = pos
+
+    def set_shape(self, shape):
+        self.shape = shape
+
+
+def snake_of_length(length):
+    """
+    A Classic round with a body of `length` cells laid out row by row from the
+    bottom of a board big enough for it, and the head moving up into empty rows.
+    """
+    limit = math.isqrt(length) + STEPS_PER_SNAKE // 2 + 2
+    m = GameModel("Classic", seed=0, board_limit=limit)
+    m.clear_cell(m.head)
+    m.clear_cell(m.food)
+
+    width = 2 * limit + 1
+    path = []
+    for i in range(length):
+        row, col = divmod(i, width)
+        x = col if row % 2 == 0 else width - 1 - col
+        path.append((x - limit, row - limit))
+
+    for cell in path:
+        m.set_cell(cell, "snake")
+    m.segments.extend(reversed(path))
+    m.pushes = length
+
+    last_x, last_y = path[-1]
+    m.head = (last_x, last_y + 1)
+    m.set_cell(m.head, "snake")
+    m.direction = "up"
+
+    # Lemon well away from the column the head runs up
+    m.food = (limit if last_x < 0 else -limit, limit)
+    m.set_cell(m.food, "food")
+    return m
+
+
+def filled_board(fill):
+    """An Easy round with `fill` of its free cells taken by spikes."""
+    m = GameModel("Easy", seed=0)
+    rng = random.Random(1)
+    cells = list(m.free.cells)
+    for cell in rng.sample(cells, int(len(cells) * fill)):
+        m.set_cell(cell, "spike")
+    return m
+
+
+# ==================================================================================
+# Benchmarks
+# ==================================================================================
+
+
+def bench_tick(length):
+    def run():
+        elapsed = 0.0
+        for _ in range(SNAKES_PER_RUN):
+            m = snake_of_length(length)
+            start = time.perf_counter()
+            for _ in range(STEPS_PER_SNAKE):
+                m.step()
+            elapsed += time.perf_counter() - start
+            assert m.alive
+        return elapsed, SNAKES_PER_RUN * STEPS_PER_SNAKE
+    return run
+
+
+def bench_spawn(fill, calls=2000):
+    def run():
+        m = filled_board(fill)
+        start = time.perf_counter()
+        for _ in range(calls):
+            m.random_safe_position(margin=2)
+        return time.perf_counter() - start, calls
+    return run
+
+
+def bench_body_sync(length):
+    def run():
+        elapsed = 0.0
+        for _ in range(SNAKES_PER_RUN):
+            m = snake_of_length(length)
+            camera = Camera()
+            camera.reset(m)
+            body = BodySprites(NullSprite, lambda sprite: None, camera)
+            body.sync(m)
+            for _ in range(STEPS_PER_SNAKE):
+                m.step()
+                start = time.perf_counter()
+                camera.follow(m.head)
+                body.sync(m)
+                elapsed += time.perf_counter() - start
+        return elapsed, SNAKES_PER_RUN * STEPS_PER_SNAKE
+    return run
+
+
+def bench_body_rebuild(length):
+    def run():
+        m = snake_of_length(length)
+        camera = Camera()
+        camera.reset(m)
+        body = BodySprites(NullSprite, lambda sprite: None, camera)
+        start = time.perf_counter()
+        body.rebuild(m)
+        return time.perf_counter() - start, 1
+    return run
+
+
+def bench_high_score_io(calls=200):
+    def run():
+        start = time.perf_counter()
+        for i in range(calls):
+            save.save_secure_high_score(i)
+            save.load_secure_high_score()
+        return time.perf_counter() - start, calls
+    return run
+
+
+def bench_leaderboard_io(calls=200):
+    entries = [(f"Player{i}", 100 - i) for i in range(save.MAX_LEADERBOARD_ENTRIES)]
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(calls):
+            save.save_secure_leaderboard(entries, "Easy")
+            save.load_secure_leaderboard("Easy")
+        return time.perf_counter() - start, calls
+    return run
+
+
+def benchmarks():
+    """(name, run) for every benchmark, in report order."""
+    for length in SNAKE_LENGTHS:
+        yield f"tick/length={length}", bench_tick(length)
+    for fill in FILL_LEVELS:
+        yield f"random_safe_position/fill={fill:.0%}", bench_spawn(fill)
+    for length in SNAKE_LENGTHS:
+        yield f"body_sync/length={length}", bench_body_sync(length)
+    for length in SNAKE_LENGTHS:
+        yield f"body_rebuild/length={length}", bench_body_rebuild(length)
+    yield "high_score/save+load", bench_high_score_io()
+    yield "leaderboard/save+load", bench_leaderboard_io()
+
+
+# ==================================================================================
+# Report
+# ==================================================================================
+
+
+def run_all(repeats, only=None):
+    results = {}
+    for name, run in benchmarks():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = summary(measure(run, repeats))
+        r = results[name]
+        print(f"{name:36} median {r['median_us']:10.2f} us   min {r['min_us']:10.2f} us"
+              f"   stdev {r['stdev_us']:8.2f} us", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a saved baseline. Returns the names that got slower."""
+    print()
+    print(f"Compared with {baseline['python']} on {baseline['machine']}:")
+    slower = []
+    for name, r in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:36} (new)")
+            continue
+        change = (r["median_us"] - old["median_us"]) / old["median_us"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:36} {old['median_us']:10.2f} -> {r['median_us']:10.2f} us  {change:+7.1f}%{flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Catch That Lemon hot paths.")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="only run benchmarks whose name contains NAME (repeatable)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare with a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change of the median that counts as a regression")
+    args = parser.parse_args()
+
+    results = run_all(args.repeats, args.only)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+                "repeats": args.repeats,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
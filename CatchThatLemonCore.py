@@ -0,0 +1,1291 @@
+import math
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+# =================================================================================
+# Catch That Lemon - Game Model
+# =================================================================================
+#
+# All game rules live here in plain Python, without turtle or pygame, so a game
+# can be stepped without a window. CatchThatLemonGame.py only draws what the
+# model holds and plays sounds for the events a step reports.
+#
+# Positions are grid cells. One cell is CELL pixels on screen, (0, 0) is the
+# centre of the playfield.
+
+
+CELL = 20
+BOARD_LIMIT = 14   # cells from the centre, the old ±280 px playfield
+MAX_BOARD_LIMIT = 500   # 1001 cells each way; bigger boards take seconds to fill with spikes
+VIEW_LIMIT = 14    # cells shown around the camera: the playfield drawn on Game_BG
+DEAD_ZONE = 6      # how far the head may move from the camera before it follows
+
+DIRECTIONS = {
+    "up": (0, 1),
+    "down": (0, -1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+
+# ==================================================================================
+# Difficulty Settings
+# ==================================================================================
+
+
+DIFFICULTY_SETTINGS = {
+    "Classic": {
+        "spawn_rotten": 0.0,
+        "spawn_rotten2": 0.0,
+        "spawn_apple": 0.0,
+        "spawn_banana": 0.0,
+        "speed_bonus": 0.0,
+        "obstacles": False,
+        "boss_mode": False,
+    },
+    "Easy": {
+        "spawn_rotten": 0.2,
+        "spawn_rotten2": 0.1,
+        "spawn_apple": 0.10,
+        "spawn_banana": 0.02,
+        "speed_bonus": 0.001,
+        "obstacles": False,
+        "boss_mode": False,
+    },
+    "Medium": {
+        "spawn_rotten": 0.35,
+        "spawn_rotten2": 0.25,
+        "spawn_rotten3": 0.15,
+        "spawn_apple": 0.12,
+        "spawn_banana": 0.04,
+        "speed_bonus": 0.002,
+        "obstacles": True,
+        "obstacle_count": 6,
+        "boss_mode": False,
+    },
+    "Hard": {
+        "spawn_rotten": 0.80,
+        "spawn_rotten2": 0.70,
+        "spawn_rotten3": 0.60,
+        "spawn_rotten4": 0.60,
+        "spawn_apple": 0.10,
+        "spawn_banana": 0.01,
+        "speed_bonus": 0.004,
+        "obstacles": True,
+        "obstacle_count": 12,
+        "boss_mode": True,
+        # TODO Implement Boss Mode.
+    }
+}
+
+
+# ==================================================================================
+# Item Registry
+# ==================================================================================
+
+# Every kind of item that can appear next to the lemon, described by data.
+# A difficulty turns a kind on with a "spawn_<kind>" chance, and every extra
+# "spawn_<kind>2", "spawn_<kind>3", ... key adds one more item of that kind, so
+# a difficulty can define as many hazards as it likes.
+#
+#   sprite  - shape name in sprites/
+#   sound   - effect played when the head picks it up
+#   score   - added to the score on pickup
+#   effect  - GameModel.effect_<name>() applied on pickup
+ITEM_KINDS = {
+    "rotten": {
+        "sprite": "Rotten_Lemon",
+        "sound": "sounds/Blegh.wav",
+        "score": -5,
+        "effect": "spoil",
+    },
+    "apple": {
+        "sprite": "Apple",
+        "sound": "sounds/Hmmm.wav",
+        "score": 5,
+        "effect": "reverse",
+    },
+    "banana": {
+        "sprite": "Banana",
+        "sound": "sounds/Hmmm.wav",
+        "score": 10,
+        "effect": "speed_up",
+    },
+}
+
+
+def item_slots(settings):
+    """
+    The item slots a difficulty uses, in settings order, as (slot, kind, chance).
+    "spawn_rotten2" is slot "rotten2" of kind "rotten".
+    """
+    slots = []
+    for key, chance in settings.items():
+        if not key.startswith("spawn_"):
+            continue
+        slot = key[len("spawn_"):]
+        kind = slot.rstrip("0123456789")
+        if kind in ITEM_KINDS:
+            slots.append((slot, kind, chance))
+    return slots
+
+
+SPAWN_ATTEMPTS = 16   # tries at a roomy cell before any free cell will do
+
+START_DELAY = 0.1
+MIN_DELAY = 0.03
+REVERSE_SECONDS = 5
+INPUT_QUEUE_SIZE = 3   # turns that can wait for their tick; more presses are dropped
+
+
+def opposite_direction(direction: str) -> str:
+    if direction == "up":
+        return "down"
+    if direction == "down":
+        return "up"
+    if direction == "left":
+        return "right"
+    if direction == "right":
+        return "left"
+    return direction
+
+
+def cell_to_pixels(cell):
+    return cell[0] * CELL, cell[1] * CELL
+
+
+def is_horizontal(cell, prev):
+    """True when a body segment at `cell` lies left/right of the cell in front of it."""
+    return abs(cell[0] - prev[0]) > abs(cell[1] - prev[1])
+
+
+def margin_offsets(margin):
+    """All (dx, dy) closer than `margin` cells to the centre, except the centre itself."""
+    if margin not in _MARGIN_OFFSETS:
+        r = int(margin)
+        _MARGIN_OFFSETS[margin] = [
+            (dx, dy)
+            for dx in range(-r, r + 1)
+            for dy in range(-r, r + 1)
+            if (dx or dy) and dx * dx + dy * dy < margin * margin
+        ]
+    return _MARGIN_OFFSETS[margin]
+
+
+_MARGIN_OFFSETS = {}
+
+
+# =================================================================================
+# Free Cells
+# =================================================================================
+
+
+class FreeCells:
+    """
+    The empty cells of the board, with O(1) add, remove and uniform random pick.
+    Cells sit in a list with a dict from cell to list index; removing a cell
+    moves the last cell into its slot.
+    """
+
+    def __init__(self, cells=()):
+        self.cells = list(cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def add(self, cell):
+        if cell in self.index:
+            return
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def discard(self, cell):
+        i = self.index.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.index[last] = i
+
+    def choice(self, rng):
+        """Uniform random free cell, or None when the board is full."""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+FREE_LIST_MAX = 250_000   # boards with more cells than this use SparseCells
+
+
+class SparseCells:
+    """
+    FreeCells for boards too big to list every cell: choice() draws random
+    cells from the whole board until it finds an empty one. Such a board is
+    nearly empty, so that takes one or two draws.
+    """
+
+    TRIES = 64
+
+    def __init__(self, limit_x, limit_y, grid):
+        self.limit_x = limit_x
+        self.limit_y = limit_y
+        self.grid = grid
+
+    def __len__(self):
+        return (2 * self.limit_x + 1) * (2 * self.limit_y + 1) - len(self.grid)
+
+    def __contains__(self, cell):
+        return (abs(cell[0]) <= self.limit_x and abs(cell[1]) <= self.limit_y
+                and cell not in self.grid)
+
+    def add(self, cell):
+        pass
+
+    def discard(self, cell):
+        pass
+
+    def choice(self, rng):
+        for _ in range(self.TRIES):
+            cell = (rng.randint(-self.limit_x, self.limit_x), rng.randint(-self.limit_y, self.limit_y))
+            if cell not in self.grid:
+                return cell
+        return None
+
+
+def board_limits(limit):
+    """A board limit is one number for a square board or (x, y) cells from the centre."""
+    if isinstance(limit, int):
+        return limit, limit
+    return tuple(limit)
+
+
+def board_cells(limit=BOARD_LIMIT):
+    limit_x, limit_y = board_limits(limit)
+    return [
+        (x, y)
+        for x in range(-limit_x, limit_x + 1)
+        for y in range(-limit_y, limit_y + 1)
+    ]
+
+
+# =================================================================================
+# Game Model
+# =================================================================================
+
+
+class GameModel:
+    """
+    One round of Catch That Lemon. Call step() once per game tick.
+
+    All randomness comes from one random.Random seeded with `seed`, and every
+    turn is logged as (tick, direction), so a round can be replayed exactly.
+    """
+
+    def __init__(self, difficulty="Easy", seed=None, board_limit=BOARD_LIMIT):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.difficulty = difficulty
+        self.board_limit = board_limits(board_limit)
+        self.limit_x, self.limit_y = self.board_limit
+        # Bigger boards get proportionally more spikes
+        self.board_scale = ((2 * self.limit_x + 1) * (2 * self.limit_y + 1)
+                            / (2 * BOARD_LIMIT + 1) ** 2)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.inputs = []          # (tick, direction) for every turn asked for
+        self.profiler = None      # a PhaseTimer while the debug overlay is on
+        self.slots = item_slots(self.settings)
+        self.slot_kinds = {slot: kind for slot, kind, _ in self.slots}
+        self.reset()
+
+    @property
+    def settings(self):
+        return DIFFICULTY_SETTINGS[self.difficulty]
+
+    def reset(self):
+        # Occupancy grid: cell -> "snake", "spike", "food" or an item name.
+        # Kept up to date on every move and spawn, so a collision is one lookup.
+        # `free` always holds exactly the board cells missing from the grid.
+        self.grid = {}
+        if (2 * self.limit_x + 1) * (2 * self.limit_y + 1) > FREE_LIST_MAX:
+            self.free = SparseCells(self.limit_x, self.limit_y, self.grid)
+        else:
+            self.free = FreeCells(board_cells(self.board_limit))
+
+        self.head = (0, 0)
+        self.direction = "stop"
+        self.segments = deque()   # segments[0] sits right behind the head
+        self.grow = 0             # segments still to add on the next moves
+        self.pushes = 0           # cells added at the front of the body so far
+        self.pops = 0             # cells dropped from the tail so far
+        self.food = (0, 5)
+        self.items = {}           # active items only: slot -> cell
+        self.obstacles = []
+        self.obstacle_changes = 0 # bumped whenever spikes are added or removed
+        self.score = 0
+        self.delay = START_DELAY
+        self.time = 0.0           # game seconds, advanced by delay every step
+        self.ticks = 0
+        self.reverse_controls = False
+        self.reverse_timer = 0.0
+        self.turns = deque()      # queued (direction, key time), one is taken per tick
+        self.turn_stamps = []     # key times of turns the head has made, for latency
+        self.alive = True
+        self.death_cause = None
+
+        self.set_cell(self.head, "snake")
+        self.set_cell(self.food, "food")
+
+        D = self.settings
+        if D.get("obstacles", False):
+            self.spawn_obstacles(round(D.get("obstacle_count", 0) * self.board_scale))
+
+    # -----------------------------------------------------------------------------
+    # Occupancy
+    # -----------------------------------------------------------------------------
+
+    def set_cell(self, cell, what):
+        self.grid[cell] = what
+        self.free.discard(cell)
+
+    def clear_cell(self, cell):
+        if self.grid.pop(cell, None) is not None:
+            self.free.add(cell)
+
+    # -----------------------------------------------------------------------------
+    # Spawning
+    # -----------------------------------------------------------------------------
+
+    def random_safe_position(self, margin=2, extra_forbidden=None):
+        """
+        Pick a random free cell, preferring one at least `margin` cells away
+        from the snake, spikes and items. On a crowded board any free cell will do.
+        Returns None when no free cell is left.
+        """
+        cell = None
+        for _ in range(SPAWN_ATTEMPTS):
+            cell = self.free.choice(self.rng)
+            if cell is None:
+                return None
+            if self.is_roomy(cell, margin, extra_forbidden):
+                return cell
+        return cell
+
+    def is_roomy(self, cell, margin, extra_forbidden=None):
+        x, y = cell
+        grid = self.grid
+        for dx, dy in margin_offsets(margin):
+            if (x + dx, y + dy) in grid:
+                return False
+
+        # Optional extra stuff to avoid (like: don't spawn rotten on top of food)
+        if extra_forbidden:
+            for fx, fy in extra_forbidden:
+                if (fx - x) ** 2 + (fy - y) ** 2 < margin * margin:
+                    return False
+        return True
+
+    def clear_obstacles(self):
+        for cell in self.obstacles:
+            self.clear_cell(cell)
+        self.obstacles.clear()
+        self.obstacle_changes += 1
+
+    def spawn_obstacles(self, count):
+        self.clear_obstacles()
+        for _ in range(count):
+            cell = self.random_safe_position(margin=4)
+            if cell is None:
+                break
+            self.obstacles.append(cell)
+            self.set_cell(cell, "spike")
+        self.obstacle_changes += 1
+
+    def place_item(self, slot, cell):
+        old = self.items.pop(slot, None)
+        if old is not None and self.grid.get(old) == slot:
+            self.clear_cell(old)
+        if cell is not None:
+            self.items[slot] = cell
+            self.set_cell(cell, slot)
+
+    def clear_items(self):
+        for slot in list(self.items):
+            self.place_item(slot, None)
+
+    def roll_items(self):
+        """
+        Every lemon eaten re-rolls each item with its spawn chance for this difficulty.
+        """
+        self.clear_items()
+        for slot, _, chance in self.slots:
+            if self.rng.random() < chance:
+                self.place_item(slot, self.random_safe_position(margin=2))
+
+    # -----------------------------------------------------------------------------
+    # Controls
+    # -----------------------------------------------------------------------------
+
+    def turn(self, desired, stamp=None):
+        """
+        Queue a turn for the coming ticks. `stamp` is when the key was pressed
+        (time.perf_counter()); it ends up in turn_stamps once the head moves that way.
+        """
+        self.inputs.append((self.ticks, desired))
+        if self.reverse_controls:
+            desired = opposite_direction(desired)
+        if len(self.turns) < INPUT_QUEUE_SIZE:
+            self.turns.append((desired, stamp))
+
+    def next_turn(self):
+        """
+        Take queued turns in order until one changes the direction.
+        Turns are checked against the direction the snake moved last tick, not
+        against a turn still waiting, so two quick presses can never add up to a
+        180° flip that kills the snake.
+        """
+        while self.turns:
+            desired, stamp = self.turns.popleft()
+            if desired == self.direction or desired == opposite_direction(self.direction):
+                continue
+            self.direction = desired
+            if stamp is not None:
+                self.turn_stamps.append(stamp)
+            return
+
+    # -----------------------------------------------------------------------------
+    # Game Tick
+    # -----------------------------------------------------------------------------
+
+    def step(self, action=None):
+        """
+        Advance the game by one tick. `action` is an optional direction to turn to first.
+        Returns a list of event names ("bite", "death" or an item kind like "rotten")
+        so the caller can play sounds and animations.
+        """
+        events = []
+        if not self.alive:
+            return events
+
+        if action is not None:
+            self.turn(action)
+
+        self.ticks += 1
+        self.time += self.delay
+
+        # turn off reverse controls when time is up
+        if self.reverse_controls and self.time >= self.reverse_timer:
+            self.reverse_controls = False
+
+        self.next_turn()
+
+        if self.direction not in DIRECTIONS:
+            return events
+
+        prof = self.profiler
+
+        # --- Movement ---
+        # The body is a ring buffer: the old head cell becomes the first segment
+        # and the tail cell is dropped, whatever the length of the snake.
+        dx, dy = DIRECTIONS[self.direction]
+        self.segments.appendleft(self.head)
+        self.pushes += 1
+        if self.grow > 0:
+            self.grow -= 1
+        else:
+            # The tail leaves its cell before the head arrives, so chasing the tail is safe
+            self.clear_cell(self.segments.pop())
+            self.pops += 1
+        self.head = (self.head[0] + dx, self.head[1] + dy)
+        if prof:
+            prof.lap("movement")
+
+        # --- Collision with border, own body and obstacles ---
+        x, y = self.head
+        if abs(x) > self.limit_x or abs(y) > self.limit_y:
+            self.die("border", events)
+            return events
+
+        hit = self.grid.get(self.head)
+        if hit == "snake":
+            self.die("self", events)
+        elif hit == "spike":
+            self.die("obstacle", events)
+        else:
+            self.set_cell(self.head, "snake")
+            if prof:
+                prof.lap("collisions")
+            if hit is not None:
+                self.check_items(hit, events)
+                if prof:
+                    prof.lap("items")
+
+        return events
+
+    def check_items(self, hit, events):
+        """
+        Apply the item the head just landed on. `hit` is what the grid held there.
+        """
+        # --- Collision with good lemon ---
+        if hit == "food":
+            events.append("bite")
+            # No free cell left means no new lemon: the board is full
+            self.food = self.random_safe_position(margin=2)
+            if self.food is not None:
+                self.set_cell(self.food, "food")
+            self.grow += 1
+            self.roll_items()
+            self.effect_speed_up(events)
+            self.score += 1
+            return
+
+        # The head now owns the item's cell in the grid
+        kind = self.slot_kinds[hit]
+        del self.items[hit]
+
+        item = ITEM_KINDS[kind]
+        events.append(kind)
+        self.score += item["score"]
+        getattr(self, "effect_" + item["effect"])(events)
+
+    # -----------------------------------------------------------------------------
+    # Item Effects
+    # -----------------------------------------------------------------------------
+
+    def effect_speed_up(self, events):
+        self.delay = max(MIN_DELAY, self.delay - self.settings["speed_bonus"])
+
+    def effect_reverse(self, events):
+        self.reverse_controls = True
+        self.reverse_timer = self.time + REVERSE_SECONDS
+
+    def effect_spoil(self, events):
+        self.reverse_controls = False
+        if self.score < 0:
+            self.die("rotten", events)
+
+    def die(self, cause, events):
+        self.alive = False
+        self.death_cause = cause
+        self.direction = "stop"
+        self.reverse_controls = False
+        self.clear_items()
+        events.append("death")
+
+
+# =================================================================================
+# Camera
+# =================================================================================
+
+
+class Camera:
+    """
+    The part of the board on screen: `view` cells around `origin` each way.
+    A board that fits is shown whole and never scrolls. On a bigger board the
+    camera follows the head once it leaves the dead zone around the centre,
+    and stops at the board edges.
+    """
+
+    def __init__(self, view=VIEW_LIMIT, dead_zone=DEAD_ZONE):
+        self.view = view
+        self.dead_zone = dead_zone
+        self.origin = (0, 0)
+        self.max_x = 0
+        self.max_y = 0
+        self.moves = 0            # bumped every time the origin changes
+
+    def reset(self, m):
+        self.max_x = max(0, m.limit_x - self.view)
+        self.max_y = max(0, m.limit_y - self.view)
+        self.origin = (0, 0)
+        self.moves += 1
+        self.follow(m.head)
+
+    @property
+    def scrolls(self):
+        return bool(self.max_x or self.max_y)
+
+    @property
+    def area(self):
+        return (2 * self.view + 1) ** 2
+
+    def follow(self, cell):
+        """Move so `cell` is inside the dead zone. True when the camera moved."""
+        ox, oy = self.origin
+        x, y = cell
+        ox = min(max(ox, x - self.dead_zone), x + self.dead_zone)
+        oy = min(max(oy, y - self.dead_zone), y + self.dead_zone)
+        ox = min(max(ox, -self.max_x), self.max_x)
+        oy = min(max(oy, -self.max_y), self.max_y)
+        if (ox, oy) == self.origin:
+            return False
+        self.origin = (ox, oy)
+        self.moves += 1
+        return True
+
+    def visible(self, cell):
+        return (abs(cell[0] - self.origin[0]) <= self.view
+                and abs(cell[1] - self.origin[1]) <= self.view)
+
+    def to_pixels(self, cell):
+        return (cell[0] - self.origin[0]) * CELL, (cell[1] - self.origin[1]) * CELL
+
+    def cells(self):
+        """Every cell on screen."""
+        ox, oy = self.origin
+        for x in range(ox - self.view, ox + self.view + 1):
+            for y in range(oy - self.view, oy + self.view + 1):
+                yield x, y
+
+
+# =================================================================================
+# Body Sprites
+# =================================================================================
+
+
+class BodySprites:
+    """
+    Sprites for the body cells the camera shows, kept in step with model.segments.
+
+    `cells` mirrors model.segments and `shapes` remembers each cell's segment
+    sprite. sync() only handles the cells gained or lost since the last call,
+    using the model's push/pop counters, so a tick costs the same whatever the
+    length of the snake. Cells off screen get no sprite at all; when the camera
+    moves, the sprites are laid out again from the cells on screen.
+
+    Sprites only need goto((x, y)) and set_shape(name), so every renderer can
+    share this.
+    """
+
+    def __init__(self, acquire, release, camera,
+                 horizontal="Snake_Segment_Horizontal", vertical="Snake_Segment_Vertical"):
+        self.acquire = acquire    # () -> new sprite
+        self.release = release    # (sprite) -> None
+        self.camera = camera
+        self.horizontal = horizontal
+        self.vertical = vertical
+
+        self.cells = deque()      # same order as model.segments
+        self.shapes = {}          # cell -> segment sprite name
+        self.sprites = {}         # cell -> sprite, for cells on screen only
+        self.body = None          # the model.segments deque being followed
+        self.pushes = 0
+        self.pops = 0
+        self.camera_moves = None
+
+    def __iter__(self):
+        return iter(self.sprites.values())
+
+    def sync(self, m):
+        if self.body is not m.segments:
+            self.rebuild(m)
+            return
+
+        pops = m.pops - self.pops
+        self.pushes = m.pushes
+        self.pops = m.pops
+
+        dropped = []
+        for _ in range(min(pops, len(self.cells))):
+            cell = self.cells.pop()
+            del self.shapes[cell]
+            seg = self.sprites.pop(cell, None)
+            if seg is not None:
+                dropped.append(seg)
+
+        # Newest cells are at the front of the body
+        added = len(m.segments) - len(self.cells)
+        for index in range(added - 1, -1, -1):
+            cell = m.segments[index]
+            prev = m.head if index == 0 else m.segments[index - 1]
+            self.cells.appendleft(cell)
+            self.shapes[cell] = self.shape_for(cell, prev)
+            if self.camera.visible(cell):
+                self.show(cell, dropped.pop() if dropped else self.acquire())
+
+        for seg in dropped:
+            self.release(seg)
+
+        if self.camera_moves != self.camera.moves:
+            self.relayout()
+
+    def rebuild(self, m):
+        # New round: hand every sprite back and lay the whole body out again
+        self.clear()
+
+        self.body = m.segments
+        self.pushes = m.pushes
+        self.pops = m.pops
+        prev = m.head
+        for cell in m.segments:
+            self.cells.append(cell)
+            self.shapes[cell] = self.shape_for(cell, prev)
+            prev = cell
+        self.relayout()
+
+    def relayout(self):
+        """The camera moved: drop sprites that left the screen, add the ones that came in."""
+        camera = self.camera
+        self.camera_moves = camera.moves
+
+        for cell in [cell for cell in self.sprites if not camera.visible(cell)]:
+            self.release(self.sprites.pop(cell))
+
+        if len(self.shapes) < camera.area:
+            on_screen = [cell for cell in self.cells if camera.visible(cell)]
+        else:
+            on_screen = [cell for cell in camera.cells() if cell in self.shapes]
+        for cell in on_screen:
+            self.show(cell, self.sprites.get(cell) or self.acquire())
+
+    def clear(self):
+        for seg in self.sprites.values():
+            self.release(seg)
+        self.sprites.clear()
+        self.cells.clear()
+        self.shapes.clear()
+        self.body = None
+
+    def shape_for(self, cell, prev):
+        # Rotational Segments: a segment's orientation only depends on the cell in front of it
+        if is_horizontal(cell, prev):
+            return self.horizontal  # moving horizontally
+        return self.vertical  # moving vertically
+
+    def show(self, cell, seg):
+        self.sprites[cell] = seg
+        seg.goto(self.camera.to_pixels(cell))
+        seg.set_shape(self.shapes[cell])
+
+
+# =================================================================================
+# Sprite Pool
+# =================================================================================
+
+
+SPRITE_POOL_CAP = 1000
+PREFILL_SPRITES = 64   # body and spike sprites made before the first round
+
+
+class SpritePool:
+    """
+    Hands out sprites and takes them back, so a growing snake, new spikes and
+    every retry reuse the same sprites instead of creating new ones.
+    prefill() makes sprites up front, so the first rounds do not stall on
+    creating them; anything needed beyond that is still made on demand.
+
+    `cap` bounds the idle sprites: anything released past it is destroyed, so
+    memory stays flat however many rounds are played. Sprites in use are not
+    capped, but the renderer only uses them for what is on screen, so their
+    number is bounded by the camera's view anyway.
+
+    Idle sprites are hidden and detached, so the backend does not even look
+    at them. `kind` makes a sprite from a shape name; sprites need set_shape,
+    goto, show, hide, blink, attach, detach and destroy.
+    """
+
+    def __init__(self, kind, cap=SPRITE_POOL_CAP):
+        self.kind = kind
+        self.idle = []
+        self.cap = cap
+        self.created = 0
+
+    def acquire(self, shape_name):
+        if self.idle:
+            sprite = self.idle.pop()
+            sprite.set_shape(shape_name)
+            sprite.blink(True)
+            sprite.show()
+            sprite.attach()
+            return sprite
+        self.created += 1
+        return self.kind(shape_name)
+
+    def prefill(self, shape_name, count):
+        """Make idle sprites until `count` (or `cap`) are waiting."""
+        while len(self.idle) < min(count, self.cap):
+            self.created += 1
+            self.release(self.kind(shape_name))
+
+    def release(self, sprite):
+        if len(self.idle) >= self.cap:
+            sprite.destroy()
+            self.created -= 1
+            return
+        sprite.hide()
+        sprite.detach()
+        self.idle.append(sprite)
+
+
+# =================================================================================
+# Board Renderer
+# =================================================================================
+
+
+HEAD_SPRITES = {
+    "up": "Snake_Up",
+    "down": "Snake_Down",
+    "left": "Snake_Left",
+    "right": "Snake_Right",
+}
+
+
+class BoardRenderer:
+    """
+    Draws whatever the GameModel holds, one pool sprite per thing on screen.
+    The renderer never decides anything about the game itself.
+    It lives for the whole session; start_round() hands sprites the new round
+    does not need back to the sprite pool.
+
+    Only what the camera shows gets drawn: anything off screen or out of play
+    is hidden, and the body and spikes only get sprites for the cells on screen.
+    Backends subclass it for what is not a sprite, like the board outline.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.camera = Camera()
+        self.head = self.pool.acquire("Snake_Up")
+        self.food = self.pool.acquire("Lemon")
+        self.items = {}            # one sprite per item slot, made on first use
+        self.obstacles = []        # sprites for the spikes on screen
+        self.obstacles_drawn = None
+        self.head_offset = (0, 0)  # set by the bite and death tweens
+        self.profiler = None       # a PhaseTimer while the debug overlay is on
+
+        # One sprite per body cell on screen
+        self.body = BodySprites(self.new_segment, self.pool.release, self.camera)
+        self.pool.prefill("Snake_Segment_Vertical", PREFILL_SPRITES)
+
+    def start_round(self, m):
+        self.head_offset = (0, 0)
+        for slot in list(self.items):
+            if slot not in m.slot_kinds:
+                self.pool.release(self.items.pop(slot))
+        self.camera.reset(m)
+        self.obstacles_drawn = None
+        self.draw(m)
+
+    def draw(self, m):
+        prof = self.profiler
+        if self.camera.follow(m.head) or self.obstacles_drawn is None:
+            self.draw_edge(m)
+        self.move(m)
+        self.place(self.food, m.food)
+
+        self.draw_items(m)
+        if prof:
+            prof.lap("draw")
+
+        self.update_body_sprites(m)
+        if prof:
+            prof.lap("body sprites")
+
+        self.draw_obstacles(m)
+        if prof:
+            prof.lap("draw")
+
+    def place(self, sprite, cell):
+        """Move a sprite to a cell, or hide it when the cell is off screen or None."""
+        if cell is not None and self.camera.visible(cell):
+            sprite.goto(self.camera.to_pixels(cell))
+            sprite.show()
+        else:
+            sprite.hide()
+
+    def draw_items(self, m):
+        for slot, cell in m.items.items():
+            sprite = self.items.get(slot)
+            if sprite is None:
+                sprite = self.pool.acquire(ITEM_KINDS[m.slot_kinds[slot]]["sprite"])
+                self.items[slot] = sprite
+            self.place(sprite, cell)
+
+        for slot, sprite in self.items.items():
+            if slot not in m.items:
+                sprite.hide()
+
+    def move(self, m):
+        x, y = self.camera.to_pixels(m.head)
+        ox, oy = self.head_offset
+        self.head.goto((x + ox, y + oy))
+        self.head.show()
+        if m.direction in HEAD_SPRITES:
+            self.head.set_shape(HEAD_SPRITES[m.direction])
+
+    def update_body_sprites(self, m):
+        """
+        Only the body cells gained or lost since the last frame are redrawn.
+        The sprite leaving the tail is moved to the new cell behind the head.
+        """
+        self.body.sync(m)
+
+    def new_segment(self):
+        return self.pool.acquire("Snake_Segment_Vertical")
+
+    def draw_obstacles(self, m):
+        # Spikes only change between rounds, so only redraw when they or the camera moved
+        drawn = (m.obstacle_changes, self.camera.moves)
+        if drawn == self.obstacles_drawn:
+            return
+        self.obstacles_drawn = drawn
+
+        camera = self.camera
+        if len(m.obstacles) < camera.area:
+            cells = [cell for cell in m.obstacles if camera.visible(cell)]
+        else:
+            cells = [cell for cell in camera.cells() if m.grid.get(cell) == "spike"]
+
+        while len(self.obstacles) < len(cells):
+            self.obstacles.append(self.pool.acquire("Spike"))
+        while len(self.obstacles) > len(cells):
+            self.pool.release(self.obstacles.pop())
+
+        for ob, cell in zip(self.obstacles, cells):
+            ob.goto(camera.to_pixels(cell))
+
+    def board_edge(self, m):
+        """
+        The board's outer edge as (left, top, right, bottom) screen pixels, or
+        None when the board is exactly the playfield Game_BG frames.
+        Smaller boards get an outline too, inside the Game_BG frame.
+        """
+        if (m.limit_x, m.limit_y) == (VIEW_LIMIT, VIEW_LIMIT):
+            return None
+        left, top = self.camera.to_pixels((-m.limit_x, m.limit_y))
+        right, bottom = self.camera.to_pixels((m.limit_x, -m.limit_y))
+        half = CELL / 2
+        return left - half, top + half, right + half, bottom - half
+
+    def draw_edge(self, m):
+        """Outline the board when it is bigger than the screen (backend specific)."""
+
+    def hide_edge(self):
+        pass
+
+    def hide_round(self):
+        """Hide everything on the board when the round ends or is left."""
+        self.head_offset = (0, 0)
+        self.head.hide()
+        self.food.hide()
+        for seg in self.body:
+            seg.hide()
+        for sprite in self.items.values():
+            sprite.hide()
+
+        # Spikes go back to the pool; start_round() lays out the new ones
+        while self.obstacles:
+            self.pool.release(self.obstacles.pop())
+        self.obstacles_drawn = None
+        self.hide_edge()
+
+
+# =================================================================================
+# Fixed Timestep Clock
+# =================================================================================
+
+
+class RateMeter:
+    """Events per second over the last `window` timestamps."""
+
+    def __init__(self, window=60):
+        self.stamps = deque(maxlen=window)
+
+    def mark(self, now):
+        self.stamps.append(now)
+
+    def clear(self):
+        self.stamps.clear()
+
+    @property
+    def rate(self):
+        if len(self.stamps) < 2:
+            return 0.0
+        span = self.stamps[-1] - self.stamps[0]
+        return (len(self.stamps) - 1) / span if span > 0 else 0.0
+
+
+class FixedStepClock:
+    """
+    Fixed-timestep scheduler on a monotonic clock.
+
+    Every frame adds the real time that passed to an accumulator, and the game
+    runs one tick for every `tick_length` the accumulator holds. The game speed
+    then only depends on the tick length (the model's delay), not on how long
+    drawing a frame takes.
+    """
+
+    def __init__(self, now=time.perf_counter, max_ticks_per_frame=5):
+        self.now = now
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.tick_meter = RateMeter()
+        self.frame_meter = RateMeter()
+        self.reset()
+
+    def reset(self):
+        """Start counting from now, e.g. after a pause or a new round."""
+        self.last = self.now()
+        self.accumulator = 0.0
+        self.frame_ticks = 0
+        self.tick_meter.clear()
+        self.frame_meter.clear()
+
+    def begin_frame(self):
+        now = self.now()
+        self.accumulator += now - self.last
+        self.last = now
+        self.frame_ticks = 0
+        self.frame_meter.mark(now)
+
+    def consume(self, tick_length):
+        """True if one more tick of `tick_length` seconds is due this frame."""
+        if self.accumulator < tick_length:
+            return False
+
+        # Too far behind (slow machine or a blocking call): drop the backlog
+        # instead of running ever more ticks per frame.
+        if self.frame_ticks >= self.max_ticks_per_frame:
+            self.accumulator = 0.0
+            return False
+
+        self.accumulator -= tick_length
+        self.frame_ticks += 1
+        self.tick_meter.mark(self.last)
+        return True
+
+    def time_to_next_tick(self, tick_length):
+        return max(0.0, tick_length - self.accumulator)
+
+    @property
+    def tick_rate(self):
+        """Measured game ticks per second."""
+        return self.tick_meter.rate
+
+    @property
+    def frame_rate(self):
+        """Measured frames per second."""
+        return self.frame_meter.rate
+
+
+# =================================================================================
+# Frame Statistics
+# =================================================================================
+
+
+class PhaseTimer:
+    """
+    Splits a frame into named phases: lap(name) charges the time since the
+    previous lap (or start()) to `name`. Laps with the same name add up.
+    """
+
+    def __init__(self, now=time.perf_counter):
+        self.now = now
+        self.last = 0.0
+        self.totals = {}
+
+    def start(self):
+        self.totals = {}
+        self.last = self.now()
+
+    def lap(self, name):
+        t = self.now()
+        self.totals[name] = self.totals.get(name, 0.0) + t - self.last
+        self.last = t
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list, 0 when it is empty."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class FrameStats:
+    """
+    Frame and phase times over the last `window` frames, for the debug overlay.
+    Call begin_frame() and end_frame() around every frame and let the code in
+    between lap() the phases. The time from one frame's end to the next one's
+    start is kept as the "idle" phase: the sleep between frames.
+    """
+
+    # Upper bounds; the last bin is open. Frames follow the tick rate, 10 to 33 per second
+    HISTOGRAM_MS = (10, 17, 25, 33, 50, 75, 100, 150)
+
+    def __init__(self, window=300, now=time.perf_counter):
+        self.now = now
+        self.window = window
+        self.phases = PhaseTimer(now)
+        self.reset()
+
+    def reset(self):
+        self.frames = deque(maxlen=self.window)   # start to start, seconds
+        self.work = deque(maxlen=self.window)     # start to end, seconds
+        self.phase_times = {}                     # name -> deque of seconds
+        self.input_latency = deque(maxlen=self.window)   # key press to turn on screen
+        self.frame_start = None
+        self.frame_end = None
+
+    def begin_frame(self):
+        t = self.now()
+        if self.frame_start is not None:
+            self.frames.append(t - self.frame_start)
+        if self.frame_end is not None:
+            self.record("idle", t - self.frame_end)
+        self.frame_start = t
+        self.phases.start()
+
+    def end_frame(self):
+        t = self.now()
+        self.work.append(t - self.frame_start)
+        for name, seconds in self.phases.totals.items():
+            self.record(name, seconds)
+        self.frame_end = t
+
+    def record_input_latency(self, stamps):
+        """Key press times of turns that were just drawn."""
+        t = self.now()
+        for stamp in stamps:
+            self.input_latency.append(t - stamp)
+
+    def record(self, name, seconds):
+        times = self.phase_times.get(name)
+        if times is None:
+            times = self.phase_times[name] = deque(maxlen=self.window)
+        times.append(seconds)
+
+    def percentiles_ms(self, values, ps=(50, 95, 99)):
+        ordered = sorted(values)
+        return [percentile(ordered, p) * 1000 for p in ps]
+
+    def histogram(self):
+        """(label, count) per frame time bin, over the frames in the window."""
+        counts = [0] * (len(self.HISTOGRAM_MS) + 1)
+        for seconds in self.frames:
+            ms = seconds * 1000
+            for i, bound in enumerate(self.HISTOGRAM_MS):
+                if ms < bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+        labels = []
+        low = 0
+        for bound in self.HISTOGRAM_MS:
+            labels.append(f"{low:>3}-{bound:<3} ms")
+            low = bound
+        labels.append(f"{low:>3}+    ms")
+        return list(zip(labels, counts))
+
+
+# =================================================================================
+# Replays
+# =================================================================================
+#
+# A replay file is a header followed by one 5 byte record per turn:
+#
+#   b"CTLR", version (u8), seed (u64), ticks (u32), score (i32),
+#   board limit x and y (u16 each), difficulty length (u8) + utf-8 name,
+#   input count (u32)
+#   then per input: tick (u32), direction (u8)
+
+
+REPLAY_MAGIC = b"CTLR"
+REPLAY_VERSION = 3   # 2: turns are queued and applied one per tick, 3: board size
+REPLAY_HEADER = struct.Struct("<4sBQIiHHB")
+REPLAY_COUNT = struct.Struct("<I")
+REPLAY_INPUT = struct.Struct("<IB")
+
+DIRECTION_CODES = {"up": 0, "down": 1, "left": 2, "right": 3}
+CODE_DIRECTIONS = {code: name for name, code in DIRECTION_CODES.items()}
+
+
+def save_replay(model, path):
+    """Write the seed, difficulty, result and every input of `model` to `path`."""
+    name = model.difficulty.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, model.seed,
+                                   model.ticks, model.score, model.limit_x, model.limit_y,
+                                   len(name)))
+        f.write(name)
+        f.write(REPLAY_COUNT.pack(len(model.inputs)))
+        for tick, direction in model.inputs:
+            f.write(REPLAY_INPUT.pack(tick, DIRECTION_CODES[direction]))
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version = data[:4], data[4] if len(data) > 4 else None
+    if magic != REPLAY_MAGIC:
+        raise ValueError(f"'{path}' is not a Catch That Lemon replay")
+    if version != REPLAY_VERSION:
+        raise ValueError(f"'{path}' was recorded by another version of the game")
+    _, _, seed, ticks, score, limit_x, limit_y, name_len = REPLAY_HEADER.unpack_from(data, 0)
+
+    offset = REPLAY_HEADER.size
+    difficulty = data[offset:offset + name_len].decode("utf-8")
+    offset += name_len
+    (count,) = REPLAY_COUNT.unpack_from(data, offset)
+    offset += REPLAY_COUNT.size
+
+    inputs = []
+    for tick, code in REPLAY_INPUT.iter_unpack(data[offset:offset + count * REPLAY_INPUT.size]):
+        inputs.append((tick, CODE_DIRECTIONS[code]))
+
+    return {
+        "seed": seed,
+        "difficulty": difficulty,
+        "board_limit": (limit_x, limit_y),
+        "ticks": ticks,
+        "score": score,
+        "inputs": inputs,
+    }
+
+
+def replay_game(replay):
+    """
+    Re-simulate a recorded round at full speed, without drawing anything.
+    `replay` is a path or what load_replay() returned. Returns the finished model.
+    """
+    if isinstance(replay, str):
+        replay = load_replay(replay)
+
+    model = GameModel(replay["difficulty"], seed=replay["seed"], board_limit=replay["board_limit"])
+    inputs = deque(replay["inputs"])
+    while model.alive and model.ticks < replay["ticks"]:
+        # Turns pressed between two ticks are queued before the next one, in order
+        while inputs and inputs[0][0] <= model.ticks:
+            model.turn(inputs.popleft()[1])
+        model.step()
+    return model
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "--replay":
+        print("Usage: python CatchThatLemonCore.py --replay <file>")
+        raise SystemExit(2)
+
+    recorded = load_replay(sys.argv[2])
+    start = time.perf_counter()
+    result = replay_game(recorded)
+    elapsed = time.perf_counter() - start
+
+    print(f"Difficulty: {recorded['difficulty']}  Seed: {recorded['seed']}  Inputs: {len(recorded['inputs'])}"
+          f"  Board: ±{recorded['board_limit'][0]} x ±{recorded['board_limit'][1]}")
+    print(f"Recorded: {recorded['ticks']} ticks, score {recorded['score']}")
+    print(f"Replayed: {result.ticks} ticks, score {result.score}, death: {result.death_cause}")
+    print(f"Simulated in {elapsed:.3f}s")
+    if (result.ticks, result.score) != (recorded["ticks"], recorded["score"]):
+        print("Replay does not match the recording!")
+        raise SystemExit(1)
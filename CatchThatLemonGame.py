@@ -1,16 +1,32 @@
 import turtle
 import time
-import random
+import math
 import pygame
 import os, sys
+import argparse
+import struct
 import tkinter as tk
+from collections import deque
+
+from CatchThatLemonCore import (
+   GameModel, FixedStepClock, FrameStats, SpritePool, BoardRenderer,
+   BOARD_LIMIT, MAX_BOARD_LIMIT, DIRECTIONS, HEAD_SPRITES, ITEM_KINDS, save_replay,
+)
+from CatchThatLemonAudio import MENU_MUSIC, GAME_MUSIC, SFX_FILES, MusicManager, SoundBank
+from CatchThatLemonSave import (
+   LAST_REPLAY_FILE,
+   MAX_LEADERBOARD_ENTRIES,
+   load_secure_high_score,
+   save_secure_high_score,
+   load_secure_leaderboard,
+   save_secure_leaderboard,
+)
 
 # =================================================================================
 # Catch That Lemon Game by Dave Luisterburg
 # =================================================================================
 
 # TODO LIST:
-# - Troubleshoot 180 Flip
 # - Add Bossfight
 # - Add different sounds to different Food Items.
 # - Spice up menu's
@@ -21,6 +37,43 @@ import tkinter as tk
 # - Add Better Game Over screen
 
 
+# =================================================================================
+# Launch Options
+# =================================================================================
+
+
+def board_size(text):
+   """ "61x41" (cells wide x high, odd, 15 to 1001) -> board limit (30, 20) """
+   try:
+       width, height = (int(n) for n in text.lower().split("x"))
+   except ValueError:
+       raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT in cells, got '{text}'")
+   if width < 15 or height < 15 or width % 2 == 0 or height % 2 == 0:
+       raise argparse.ArgumentTypeError("the board needs an odd number of cells, at least 15, each way")
+   most = 2 * MAX_BOARD_LIMIT + 1
+   if width > most or height > most:
+       raise argparse.ArgumentTypeError(f"the board can be at most {most} cells each way")
+   return (width - 1) // 2, (height - 1) // 2
+
+
+launch_time = time.perf_counter()
+launch_parser = argparse.ArgumentParser(description="Catch That Lemon")
+launch_parser.add_argument("--board", type=board_size, default=(BOARD_LIMIT, BOARD_LIMIT),
+                           metavar="WIDTHxHEIGHT",
+                           help="board size in cells; bigger than 29x29 scrolls with the snake")
+launch_parser.add_argument("--renderer", choices=["turtle", "canvas", "pygame"], default="turtle",
+                           help="draw game sprites as turtles, as plain Tk canvas images, "
+                                "or run the whole game in a pygame window")
+launch_options, _ = launch_parser.parse_known_args()
+board_limit = launch_options.board
+
+# The pygame version has its own window and loop; no turtle screen is opened for it
+if launch_options.renderer == "pygame":
+   import CatchThatLemonPygame
+   CatchThatLemonPygame.main(launch_options)
+   sys.exit()
+
+
 # =================================================================================
 # Debug
 # =================================================================================
@@ -46,13 +99,7 @@ current_screen = "menu"
 def set_bgm_volume(vol: float):
    global bgm_volume
    bgm_volume = max(0.0, min(1.0, vol))
-   pygame.mixer.music.set_volume(bgm_volume)
-
-
-def play_bgm_music(filename):
-   pygame.mixer.music.load(filename)
-   set_bgm_volume(bgm_volume)
-   pygame.mixer.music.play(-1)
+   music.set_volume(bgm_volume)
 
 
 # -- Pygame Mixer --
@@ -76,54 +123,8 @@ def cycle_difficulty():
    show_menu()
 
 
-
-
-DIFFICULTY_SETTINGS = {
-   "Classic": {
-       "spawn_rotten": 0.0,
-       "spawn_rotten2": 0.0,
-       "spawn_apple": 0.0,
-       "spawn_banana": 0.0,
-       "speed_bonus": 0.0,
-       "obstacles": False,
-       "boss_mode": False,
-   },
-   "Easy": {
-       "spawn_rotten": 0.2,
-       "spawn_rotten2": 0.1,
-       "spawn_apple": 0.10,
-       "spawn_banana": 0.02,
-       "speed_bonus": 0.001,
-       "obstacles": False,
-       "boss_mode": False,
-   },
-   "Medium": {
-       "spawn_rotten": 0.35,
-       "spawn_rotten2": 0.25,
-       "spawn_rotten3": 0.15,
-       "spawn_apple": 0.12,
-       "spawn_banana": 0.04,
-       "speed_bonus": 0.002,
-       "obstacles": True,
-       "obstacle_count": 6,
-       "boss_mode": False,
-   },
-   "Hard": {
-       "spawn_rotten": 0.80,
-       "spawn_rotten2": 0.70,
-       "spawn_rotten3": 0.60,
-       "spawn_rotten4": 0.60,
-       "spawn_apple": 0.10,
-       "spawn_banana": 0.01,
-       "speed_bonus": 0.004,
-       "obstacles": True,
-       "obstacle_count": 12,
-       "boss_mode": True,
-       # TODO Implement Boss Mode.
-   }
-}
-
-
+# The spawn chances and speed bonus per difficulty live in DIFFICULTY_SETTINGS
+# (CatchThatLemonCore.py), next to the rules that use them.
 
 
 # =================================================================================
@@ -131,100 +132,8 @@ DIFFICULTY_SETTINGS = {
 # =================================================================================
 
 
-import hashlib
-
-
-
-
-def get_save_path(filename):
-   base = os.getenv("APPDATA") or os.path.expanduser("~")
-   save_dir = os.path.join(base, "CatchThatLemon")
-   os.makedirs(save_dir, exist_ok=True)
-   return os.path.join(save_dir, filename)
-
-
-def save_secure_high_score(score: int):
-   score_str = str(int(score))
-   checksum = hashlib.sha256(score_str.encode()).hexdigest()
-   with open(SECURE_HIGH_SCORE_FILE, "w") as f:
-       f.write(score_str + "|" + checksum)
-
-
-
-
-def load_secure_high_score() -> int:
-   try:
-       text = open(SECURE_HIGH_SCORE_FILE).read().strip()
-       if "|" not in text:
-           return 0
-
-
-       score_str, checksum = text.split("|")
-
-
-       # Validate checksum
-       expected = hashlib.sha256(score_str.encode()).hexdigest()
-       if checksum == expected:
-           return int(score_str)
-       else:
-           print("⚠ High Score file was tampered with — resetting!")
-           return 0
-   except:
-       return 0
-
-
-
-
-def leaderboard_file_for(diff: str) -> str:
-   diff = diff.lower()
-   return get_save_path(f"leaderboard_{diff}.dat")  # uses your AppData helper
-
-
-MAX_LEADERBOARD_ENTRIES = 5
-SECURE_HIGH_SCORE_FILE = get_save_path("highscore_secure.dat")
-
-
-def save_secure_leaderboard(entries, diff: str):
-   path = leaderboard_file_for(diff)
-   with open(path, "w", encoding="utf-8") as f:
-       for name, score in entries[:MAX_LEADERBOARD_ENTRIES]:
-           payload = f"{name}|{score}"
-           checksum = hashlib.sha256(payload.encode()).hexdigest()
-           f.write(payload + "|" + checksum + "\n")
-
-
-
-
-def load_secure_leaderboard(diff: str):
-   path = leaderboard_file_for(diff)
-   entries = []
-   try:
-       with open(path, "r", encoding="utf-8") as f:
-           for line in f:
-               line = line.strip()
-               parts = line.split("|")
-               if len(parts) != 3:
-                   continue
-               name, score_str, checksum = parts
-               payload = f"{name}|{score_str}"
-               expected = hashlib.sha256(payload.encode()).hexdigest()
-               if checksum != expected:
-                   continue
-               try:
-                   entries.append((name, int(score_str)))
-               except:
-                   pass
-   except FileNotFoundError:
-       return []
-
-
-   return sorted(entries, key=lambda e: e[1], reverse=True)
-
-
-
-
-
-
+# Save files (high score, leaderboards, last replay) are read and written by
+# CatchThatLemonSave.py, which can be imported without opening a window.
 
 
 def maybe_update_leaderboard(final_score, diff: str):
@@ -262,27 +171,26 @@ def maybe_update_leaderboard(final_score, diff: str):
 # Music Definitions
 # ========================================================================
 
+# The music tracks, MusicManager and SoundBank live in CatchThatLemonAudio.py
+
+
+music = MusicManager()
+
 
 def play_music():
-   pygame.mixer.music.load("sounds/Game_BGM2.wav")
-   set_bgm_volume(bgm_volume)
-   pygame.mixer.music.play(-1)
+   music.play(GAME_MUSIC)
 
 
 def stop_music():
-   pygame.mixer.music.stop()
+   music.stop()
 
 
 def play_sfx(filename, volume=1.0):
-   sound = pygame.mixer.Sound(filename)
-   sound.set_volume(volume)
-   sound.play()
+   sound_bank.play(filename, volume)
 
 
 def play_bgm_music(filename):
-   pygame.mixer.music.load(filename)
-   set_bgm_volume(bgm_volume)
-   pygame.mixer.music.play(-1)
+   music.play(filename)
 
 
 # =================================================================================
@@ -292,41 +200,17 @@ def play_bgm_music(filename):
 
 # --- Global state ---
 game_started = False
-play_bgm_music("sounds/Menu_Music.mp3")
-rotten_food = None
-rotten_active = False
-rotten2_food = None
-rotten2_active = False
-rotten3_food = None
-rotten3_active = False
-rotten4_food = None
-rotten4_active = False
-apple_active = False
-apple_food = None
-banana_food = None
-banana_active = False
+sound_bank = SoundBank()
+sound_bank.preload_in_background(SFX_FILES)   # decoded while the menu comes up
+model = None
+renderer = None
 blink_turtle = turtle.Turtle()
 blink_turtle.hideturtle()
 blink_turtle.penup()
 spawn_anims = {}
-obstacles = []
-obstacles_active = False
 blink_timer_id = None
 
 
-
-
-
-
-# -- Reverse Control Mechanics --
-reverse_controls = False
-reverse_timer = 0.0
-if reverse_controls and time.time() > reverse_timer:
-   reverse_controls = False
-
-
-
-
 # =================================================================================
 # Menu Screen
 # =================================================================================
@@ -362,64 +246,76 @@ char_logo.hideturtle()
 # =================================================================================
 # Graphics
 # =================================================================================
-def head_hit_animation():
-   """Little left-right shake when the snake dies."""
-   if head is None:
-       return
+class TweenScheduler:
+   """
+   Frame-by-frame animations. A tween is a list of (seconds, callback) keyframes;
+   every frame advance() runs the keyframes that are due, so nothing ever sleeps.
+   Starting a tween under a name that is still playing replaces it.
+   """
 
+   def __init__(self):
+       self.active = {}
 
-   ox = head.xcor()
-   oy = head.ycor()
+   def start(self, name, keyframes):
+       self.active[name] = (time.perf_counter(), deque(keyframes))
 
+   def clear(self):
+       self.active.clear()
 
-   # Sequence of small x offsets
-   wiggle = [-10, 10, -8, 8, -5, 5, 0]
+   def advance(self):
+       now = time.perf_counter()
+       for name, entry in list(self.active.items()):
+           start, frames = entry
+           while frames and start + frames[0][0] <= now:
+               frames.popleft()[1]()
+           # A callback may have started a new tween under the same name
+           if not frames and self.active.get(name) is entry:
+               del self.active[name]
 
+   def time_to_next(self):
+       """Seconds until the next keyframe, or None when nothing is playing."""
+       if not self.active:
+           return None
+       now = time.perf_counter()
+       return max(0.0, min(start + frames[0][0] - now for start, frames in self.active.values()))
 
-   for dx in wiggle:
-       head.goto(ox + dx, oy)
-       wn.update()
-       time.sleep(0.03)
 
+tweens = TweenScheduler()
 
-   # Make sure it ends exactly centered
-   head.goto(ox, oy)
-   wn.update()
 
+def set_head_offset(dx, dy):
+   renderer.head_offset = (dx, dy)
+   renderer.move(model)
 
-def head_bite_animation():
-   """Small forward chomp in the direction of movement."""
-   if head is None:
+
+def head_hit_animation():
+   """Little left-right shake when the snake dies."""
+   if renderer is None:
        return
 
+   # Sequence of small x offsets, one every 0.03s, ending exactly centered
+   wiggle = [-10, 10, -8, 8, -5, 5, 0]
+   tweens.start("head", [
+       (i * 0.03, lambda dx=dx: set_head_offset(dx, 0))
+       for i, dx in enumerate(wiggle)
+   ])
+   return len(wiggle) * 0.03
 
-   ox = head.xcor()
-   oy = head.ycor()
 
+def head_bite_animation():
+   """Small forward chomp in the direction of movement."""
+   if renderer is None or model.direction not in DIRECTIONS:
+       return  # not moving, no bite
 
    # How far forward to 'bite'
    step = 10
+   dx, dy = DIRECTIONS[model.direction]
 
-
-   if head.direction == "up":
-       head.goto(ox, oy + step)
-   elif head.direction == "down":
-       head.goto(ox, oy - step)
-   elif head.direction == "left":
-       head.goto(ox - step, oy)
-   elif head.direction == "right":
-       head.goto(ox + step, oy)
-   else:
-       return  # not moving, no bite
-
-
-   wn.update()
-   time.sleep(0.04)
-
-
-   # Snap back
-   head.goto(ox, oy)
-   wn.update()
+   # Chomp, then snap back after 0.04s
+   tweens.start("head", [
+       (0.0, lambda: set_head_offset(dx * step, dy * step)),
+       (0.04, lambda: set_head_offset(0, 0)),
+   ])
 
 
 
@@ -448,130 +344,430 @@ def blink_options_text(session_id):
             blink_turtle.write("Press O for Options", align="center", font=("Arial", 25, "bold"))
 
         blink_visible = not blink_visible
+        wn.update()
         wn.ontimer(lambda: blink_options_text(session_id), 500)
 
     except (turtle.Terminator, tk.TclError):
         return
 
 # --- Sprite loader ---
-def load_gifs_from(folder):
-   result = {}
-   if not os.path.isdir(folder):
-       print(f"Warning: folder '{folder}' not found.")
-       return result
+# The GIFs each screen needs. Only "menu" is loaded before the first paint;
+# the rest is loaded in idle time once the menu is up, or when its screen
+# is first shown, whichever comes first.
+ASSET_MANIFEST = {
+   "menu": ["backgrounds/MenuScreen.gif"],
+   "options": ["backgrounds/Options_BG.gif"],
+   "game": ["backgrounds/Game_BG.gif"] + [
+       f"sprites/{name}.gif" for name in (
+           *HEAD_SPRITES.values(),
+           "Snake_Segment_Horizontal",
+           "Snake_Segment_Vertical",
+           "Lemon",
+           "Spike",
+           *(kind["sprite"] for kind in ITEM_KINDS.values()),
+       )
+   ],
+}
+BACKGROUND_LOAD_MS = 10   # pause between two idle time loads, so key presses get through
 
 
-   for filename in os.listdir(folder):
-       if filename.lower().endswith(".gif"):
-           path = os.path.join(folder, filename)
-           wn.addshape(path)
-           key = os.path.splitext(filename)[0]  # "Lemon.gif" -> "Lemon"
-           result[key] = path
-           print("Registered shape:", key, "->", path)
-   return result
+class ImageStore:
+   """
+   The sprite and background GIFs the screens need, by name.
 
+   Sprites are decoded once into a Tk PhotoImage and registered as turtle
+   shapes under their own name ("Lemon"). Backgrounds are kept as file paths:
+   wn.bgpic() decodes a file the first time it is shown and keeps the image.
+   set_background() only calls bgpic when the background really changes, so
+   redrawing a screen (every volume key press) never touches the canvas.
 
-sprites = load_gifs_from("sprites")
-backgrounds = load_gifs_from("backgrounds")
+   Tk images can only be made on the main thread, so loading "in the
+   background" means one file per wn.ontimer slot between events.
+   """
+
+   def __init__(self, screen, manifest):
+       self.screen = screen
+       self.manifest = manifest
+       self.images = {}          # sprite name -> PhotoImage
+       self.backgrounds = {}     # background name -> file path
+       self.background = None    # background on screen, None for none
+       self.pending = deque()    # paths waiting for an idle time load
+
+   def load_group(self, group):
+       """Load everything a screen needs that is not loaded yet."""
+       for path in self.manifest[group]:
+           self.load(path)
+
+   def load_later(self, *groups):
+       for group in groups:
+           self.pending.extend(self.manifest[group])
+       self.screen.ontimer(self.load_next, BACKGROUND_LOAD_MS)
+
+   def load_next(self):
+       if self.pending:
+           self.load(self.pending.popleft())
+       if self.pending:
+           self.screen.ontimer(self.load_next, BACKGROUND_LOAD_MS)
+
+   def load(self, path):
+       folder, filename = os.path.split(path)
+       name = os.path.splitext(filename)[0]  # "sprites/Lemon.gif" -> "Lemon"
+       if name in self.images or name in self.backgrounds:
+           return
+       if folder != "sprites":
+           if os.path.isfile(path):
+               self.backgrounds[name] = path
+           else:
+               print(f"Warning: could not find '{path}'")
+           return
+       try:
+           image = tk.PhotoImage(file=path, master=self.screen.getcanvas())
+       except tk.TclError as e:
+           print(f"Warning: could not load '{path}': {e}")
+           return
+       self.images[name] = image
+       self.screen.register_shape(name, turtle.Shape("image", image))
+
+   def image(self, name):
+       return self.images[name]
+
+   def set_background(self, name):
+       if name == self.background:
+           return
+       self.screen.bgpic(self.backgrounds[name] if name else "nopic")
+       self.background = name
+
+
+images = ImageStore(wn, ASSET_MANIFEST)
+images.load_group("menu")
 
 
 # --- Game objects (will be created later in start_game) ---
-head = None
-food = None
-segments = []
-pen = None
-score = 0
+hud = None
 high_score = load_secure_high_score()
-delay = 0.1
+
+# Game ticks run at the rate set by model.delay, whatever a frame costs
+clock = FixedStepClock()
+
+# F3 debug overlay; None while it is off, so the game loop skips all timing
+debug_overlay = None
+menu_ready_seconds = None   # launch to the menu taking keys, shown on the overlay
+
 
 
-def random_safe_position(margin=40, extra_forbidden=None):
+
+class Sprite:
    """
-   Pick a random (x, y) inside the playfield that is not too close
-   to the snake, or any item. `margin` is the minimum allowed distance in pixels.
+   A turtle that remembers the shape, position and visibility last sent to it.
+   Asking for the same value again is a plain comparison and never reaches the
+   Tk canvas, so a frame only costs as much as what actually changed.
+
+   show()/hide() say whether the thing it draws is in play; blink() is the
+   spawn animation flashing it. The turtle is only shown when both agree.
+   A hidden turtle is skipped by wn.update(), and goto() on it just remembers
+   the position until it is shown again.
    """
-   # Build a list of objects we want to avoid
-   forbidden = []
 
+   __slots__ = ("turtle", "shape", "pos", "drawn_pos", "active", "blinked_out", "shown")
+
+   def __init__(self, shape_name):
+       self.turtle = turtle.Turtle()
+       self.turtle.speed(0)
+       self.turtle.penup()
+       self.turtle.setundobuffer(None)  # sprites are never undone
+       self.shape = None
+       self.pos = (0, 0)
+       self.drawn_pos = (0, 0)
+       self.active = True
+       self.blinked_out = False
+       self.shown = True
+       self.set_shape(shape_name)
+
+   def set_shape(self, shape_name):
+       if shape_name != self.shape:
+           self.turtle.shape(shape_name)
+           self.shape = shape_name
+
+   def goto(self, pos):
+       self.pos = pos
+       if self.shown and pos != self.drawn_pos:
+           self.turtle.goto(pos)
+           self.drawn_pos = pos
+
+   def show(self):
+       self.active = True
+       self.refresh()
+
+   def hide(self):
+       self.active = False
+       self.refresh()
+
+   def blink(self, on):
+       self.blinked_out = not on
+       self.refresh()
+
+   def refresh(self):
+       shown = self.active and not self.blinked_out
+       if shown == self.shown:
+           return
+       if shown:
+           if self.pos != self.drawn_pos:
+               self.turtle.goto(self.pos)
+               self.drawn_pos = self.pos
+           self.turtle.showturtle()
+       else:
+           self.turtle.hideturtle()
+       self.shown = shown
 
-   if head is not None:
-       forbidden.append(head)
+   def destroy(self):
+       """Free the turtle for good: drop its canvas item and let the screen forget it."""
+       self.hide()
+       screen = self.turtle.getscreen()
+       screen.getcanvas().delete(self.turtle.turtle._item)
+       if self.turtle in screen.turtles():
+           screen.turtles().remove(self.turtle)
 
+   def attach(self):
+       wn.turtles().append(self.turtle)
 
-   for obj in (food, rotten_food, rotten2_food, rotten3_food, rotten4_food, apple_food, banana_food):
-       if obj is not None:
-           forbidden.append(obj)
+   def detach(self):
+       # Under wn.tracer(0) hideturtle() only takes effect when wn.update()
+       # draws the turtle, which it never does once it is off the list below,
+       # so blank its canvas item now
+       self.turtle._drawturtle()
+       # Off the screen's turtle list, wn.update() does not even look at it
+       wn.turtles().remove(self.turtle)
 
 
-   for ob in obstacles:
-       forbidden.append(ob)
+# -------------------------------------------------
+# Canvas Sprites
+# -------------------------------------------------
+def shape_image(shape_name):
+   """The PhotoImage decoded for a sprite."""
+   return images.image(shape_name)
 
 
-   # Avoid body segments
-   forbidden.extend(segments)
+class CanvasSprite:
+   """
+   The same interface as Sprite, drawn straight on the Tk canvas: one image
+   item moved with coords() and switched with itemconfig(), with no turtle,
+   pen or undo buffer in between and nothing for wn.update() to walk over.
+   Moves and shape changes are collected in `canvas_batch` and sent to Tk
+   once per frame by flush_canvas_sprites().
+   """
 
+   __slots__ = ("item", "shape", "pos", "drawn_shape", "drawn_pos",
+                "active", "blinked_out", "shown", "dirty")
+
+   def __init__(self, shape_name):
+       self.shape = self.drawn_shape = shape_name
+       self.pos = self.drawn_pos = (0, 0)
+       self.active = True
+       self.blinked_out = False
+       self.shown = True
+       self.dirty = False
+       self.item = wn.getcanvas().create_image(0, 0, image=shape_image(shape_name))
+
+   def set_shape(self, shape_name):
+       if shape_name != self.shape:
+           self.shape = shape_name
+           self.mark_dirty()
+
+   def goto(self, pos):
+       if pos != self.pos:
+           self.pos = pos
+           self.mark_dirty()
+
+   def mark_dirty(self):
+       if self.shown and not self.dirty:
+           self.dirty = True
+           canvas_batch.append(self)
+
+   def show(self):
+       self.active = True
+       self.refresh()
+
+   def hide(self):
+       self.active = False
+       self.refresh()
+
+   def blink(self, on):
+       self.blinked_out = not on
+       self.refresh()
+
+   def refresh(self):
+       shown = self.active and not self.blinked_out
+       if shown == self.shown:
+           return
+       self.shown = shown
+       if shown:
+           self.flush()
+           wn.getcanvas().itemconfig(self.item, state="normal")
+       else:
+           wn.getcanvas().itemconfig(self.item, state="hidden")
 
+   def flush(self):
+       self.dirty = False
+       cv = wn.getcanvas()
+       if self.pos != self.drawn_pos:
+           x, y = self.pos
+           cv.coords(self.item, x, -y)  # canvas y is flipped
+           self.drawn_pos = self.pos
+       if self.shape != self.drawn_shape:
+           cv.itemconfig(self.item, image=shape_image(self.shape))
+           self.drawn_shape = self.shape
 
+   def destroy(self):
+       wn.getcanvas().delete(self.item)
 
-   # Optional extra stuff to avoid (like: don't spawn rotten on top of food)
-   if extra_forbidden:
-       forbidden.extend(extra_forbidden)
+   def attach(self):
+       pass
 
+   def detach(self):
+       pass
 
-   while True:
-       x = random.randint(-280, 280)
-       y = random.randint(-280, 280)
 
+canvas_batch = []
 
-       too_close = False
-       for obj in forbidden:
-           # distance(x, y) works on turtles
-           if obj.distance(x, y) < margin:
-               too_close = True
-               break
 
+def flush_canvas_sprites():
+   """Send this frame's canvas sprite moves to Tk, once per sprite."""
+   for sprite in canvas_batch:
+       if sprite.dirty:
+           sprite.flush()
+   canvas_batch.clear()
 
-       if not too_close:
-           return x, y
 
+sprite_pool = SpritePool(CanvasSprite if launch_options.renderer == "canvas" else Sprite)
 
 
+class TurtleRenderer(BoardRenderer):
+   """
+   The board drawn with turtle (or canvas) sprites on the wn screen.
+   Boards other than the one Game_BG frames get a canvas rectangle as their outline.
+   """
 
-def clear_obstacles():
-   global obstacles, obstacles_active
-   for ob in obstacles:
-       ob.goto(1000, 1000)
-       ob.hideturtle()
-   obstacles.clear()
-   obstacles_active = False
+   def __init__(self):
+       self.edge = None
+       super().__init__(sprite_pool)
 
+   def draw_edge(self, m):
+       cv = wn.getcanvas()
+       edge = self.board_edge(m)
+       if edge is None:
+           self.hide_edge()
+           return
 
+       if self.edge is None:
+           self.edge = cv.create_rectangle(0, 0, 0, 0, outline="black", width=3)
+       left, top, right, bottom = edge
+       # Canvas y is flipped
+       cv.coords(self.edge, left, -top, right, -bottom)
+       cv.itemconfig(self.edge, state="normal")
 
+   def hide_edge(self):
+       if self.edge is not None:
+           wn.getcanvas().itemconfig(self.edge, state="hidden")
 
-def spawn_obstacles(count):
-   global obstacles, obstacles_active
 
+def clear_obstacles():
+   if model is not None:
+       model.clear_obstacles()
+   if renderer is not None:
+       renderer.draw_obstacles(model)
 
-   clear_obstacles()
-   if count <= 0:
-       return
 
+# -------------------------------------------------
+# Score HUD
+# -------------------------------------------------
+class ScoreHud:
+   """
+   The score line as one canvas text item that lives for the whole round.
+   update() changes its text in place, and only when a number changed, instead
+   of deleting and laying out a new text item like pen.clear()/pen.write().
+   """
 
-   for _ in range(count):
-       ob = turtle.Turtle()
-       ob.speed(0)
-       ob.penup()
-       ob.shape(sprites["Spike"])
-       ob.shapesize(stretch_wid=1, stretch_len=1)
+   def __init__(self, x=0, y=320, color="black", font=("Arial", 24, "bold")):
+       self.cv = wn.getcanvas()
+       # Same placement turtle.write(align="center") uses: canvas y is flipped
+       self.item = self.cv.create_text(x - 1, -y, text="", anchor="s", fill=color, font=font)
+       self.shown = None
 
+   def update(self, score, best):
+       if (score, best) == self.shown:
+           return
+       self.cv.itemconfig(self.item, text=f"Current Score: {score}  High Score: {best}")
+       self.shown = (score, best)
 
-       x, y = random_safe_position(margin=80)
-       ob.goto(x, y)
-       ob.showturtle()
-       obstacles.append(ob)
 
+# -------------------------------------------------
+# Debug Overlay
+# -------------------------------------------------
+class DebugOverlay:
+   """
+   Frame timing overlay (F3): start-up time, frame time percentiles, time per
+   phase of the game loop and a frame time histogram, as one canvas text item.
+   The text is rebuilt a few times per second, not every frame.
+   """
 
-   obstacles_active = True
+   REFRESH = 0.25
+
+   def __init__(self, x=-790, y=400):
+       self.cv = wn.getcanvas()
+       self.stats = FrameStats()
+       self.item = self.cv.create_text(x, -y, text="", anchor="nw", fill="black",
+                                       font=("Courier", 10, "bold"))
+       self.next_refresh = 0.0
+
+   def destroy(self):
+       self.cv.delete(self.item)
+
+   def refresh(self):
+       now = time.perf_counter()
+       if now < self.next_refresh:
+           return
+       self.next_refresh = now + self.REFRESH
+
+       stats = self.stats
+       lines = [
+           f"menu ready {menu_ready_seconds or 0.0:.2f} s after launch",
+           "frame  p50 %6.2f  p95 %6.2f  p99 %6.2f ms" % tuple(stats.percentiles_ms(stats.frames)),
+           "work   p50 %6.2f  p95 %6.2f  p99 %6.2f ms" % tuple(stats.percentiles_ms(stats.work)),
+           "input  p50 %6.2f  p95 %6.2f  p99 %6.2f ms" % tuple(stats.percentiles_ms(stats.input_latency))
+           + f"  ({len(stats.input_latency)} turns)",
+           f"{clock.frame_rate:5.1f} fps  {clock.tick_rate:5.1f} ticks/s  over {len(stats.frames)} frames",
+           "",
+           "phase             p50      p95      p99 ms",
+       ]
+       for name, times in stats.phase_times.items():
+           lines.append(f"{name:<13}" + "%9.3f%9.3f%9.3f" % tuple(stats.percentiles_ms(times)))
+
+       lines.append("")
+       histogram = stats.histogram()
+       peak = max([count for _, count in histogram] + [1])
+       for label, count in histogram:
+           lines.append(f"{label}  {count:4}  " + "#" * round(count / peak * 20))
+
+       self.cv.itemconfig(self.item, text="\n".join(lines))
+       self.cv.tag_raise(self.item)
+
+
+def toggle_debug_overlay():
+   global debug_overlay
+   if debug_overlay is None:
+       debug_overlay = DebugOverlay()
+       debug_overlay.refresh()
+       profiler = debug_overlay.stats.phases
+   else:
+       debug_overlay.destroy()
+       debug_overlay = None
+       profiler = None
+
+   if model is not None:
+       model.profiler = profiler
+   if renderer is not None:
+       renderer.profiler = profiler
+   wn.update()
 
 
 # ===============================================================================
@@ -585,8 +781,8 @@ def show_menu():
 
    t.clear()
    wn.bgcolor("black")
-   wn.bgpic(backgrounds["MenuScreen"])
-   play_bgm_music("sounds/Menu_Music.mp3")
+   images.load_group("menu")
+   images.set_background("MenuScreen")
 
    t.color("black")
    t.penup()
@@ -617,6 +813,12 @@ def show_menu():
    wn.onkey(cycle_difficulty, "x")
    wn.onkey(cycle_difficulty, "X")
 
+   # Nothing polls the screen any more, so push the new menu out now
+   wn.update()
+
+   # Opening the music file takes a moment, so only start it once the menu shows
+   play_bgm_music(MENU_MUSIC)
+
 
 
 def show_options_menu():
@@ -626,8 +828,9 @@ def show_options_menu():
 
 
    wn.bgcolor("black")
-   wn.bgpic(backgrounds["Options_BG"])
-   play_bgm_music("sounds/Menu_Music.mp3")
+   images.load_group("options")
+   images.set_background("Options_BG")
+   play_bgm_music(MENU_MUSIC)
 
 
    # ======================
@@ -699,6 +902,9 @@ def show_options_menu():
        t.write("No scores yet – go play!", align="center", font=("Arial", 14))
 
 
+   wn.update()
+
+
 
 
 
@@ -712,7 +918,7 @@ def show_game_over(final_score):
    t.clear()
    clear_obstacles()
    wn.bgcolor("black")
-   wn.bgpic("")
+   images.set_background(None)
 
 
    t.color("white")
@@ -758,6 +964,7 @@ def show_game_over(final_score):
    wn.onkey(start_game, "r")
    wn.onkey(show_menu, "m")
    wn.onkey(show_menu, "M")
+   wn.update()
 
 
 
@@ -794,8 +1001,9 @@ def options_back():
    if game_started:
        # Resume game
        current_screen = "game"
-       wn.bgpic(backgrounds["Game_BG"])
-       play_bgm_music("sounds/Game_BGM2.wav")
+       images.set_background("Game_BG")
+       play_bgm_music(GAME_MUSIC)
+       start_game_loop()
 
 
    else:
@@ -803,38 +1011,6 @@ def options_back():
        show_menu()
 
 
-# =================================================================================
-# Rotation of Segments
-# =================================================================================
-
-
-# Rotational Segments
-def update_body_sprites():
-   # Skip if no body segments
-   if len(segments) < 1:
-       return
-
-
-   # For every body segment, determine orientation
-   for i in range(len(segments)):
-       seg = segments[i]
-
-
-       # Determine the direction this segment is moving
-       if i == 0:
-           # first segment follows the head
-           prev = head
-       else:
-           prev = segments[i - 1]
-
-
-       # Compare x/y positions to decide orientation
-       if abs(seg.xcor() - prev.xcor()) > abs(seg.ycor() - prev.ycor()):
-           seg.shape(sprites["Snake_Segment_Horizontal"])  # moving horizontally
-       else:
-           seg.shape(sprites["Snake_Segment_Vertical"])  # moving vertically
-
-
 # -------------------------------------------------
 # Non-blocking blink spawn animation for items
 # -------------------------------------------------
@@ -843,14 +1019,14 @@ spawn_anims = {}
 
 def start_spawn_animation(turt, duration=0.25):
    """
-   Start a non-blocking blink animation for this turtle.
-   Works with GIF sprites (hide/show).
+   Start a non-blocking blink animation for this sprite.
+   Works with GIF sprites (Sprite.blink).
    """
    spawn_anims[turt] = {
        "start": time.time(),
        "duration": duration,
    }
-   turt.showturtle()
+   turt.blink(True)
 
 
 
@@ -867,7 +1043,7 @@ def update_spawn_animations():
 
 
        if rel >= 1.0:
-           turt.showturtle()
+           turt.blink(True)
            finished.append(turt)
            continue
 
@@ -877,10 +1053,7 @@ def update_spawn_animations():
 
 
        # Even phases: visible, odd: hidden
-       if phase % 2 == 0:
-           turt.showturtle()
-       else:
-           turt.hideturtle()
+       turt.blink(phase % 2 == 0)
 
 
    for turt in finished:
@@ -889,74 +1062,21 @@ def update_spawn_animations():
 
 
 
-# =================================================================================
-# Snake Segments
-# =================================================================================
-
-
-# -- New Segment Positions --
-def get_new_segment_position():
-   """
-   Returns an (x, y) for where the new body segment should spawn.
-   """
-   if len(segments) == 0:
-       # No segments yet -> follow the head
-       follower = head
-   else:
-       # Follow last segment of Snake
-       follower = segments[-1]
-
-
-   x = follower.xcor()
-   y = follower.ycor()
-
-
-   # Offset backwards based on direction
-   if follower == head:
-       direction = head.direction
-   else:
-       # Determine direction of this segment by comparing with the segment in front
-       if len(segments) == 1:
-           prev = head
-       else:
-           prev = segments[-2]
-
-
-       dx = follower.xcor() - prev.xcor()
-       dy = follower.ycor() - prev.ycor()
-
-
-       if abs(dx) > abs(dy):
-           direction = "right" if dx > 0 else "left"
-       else:
-           direction = "up" if dy > 0 else "down"
-
-
-   if direction == "up":
-       y -= 20
-   elif direction == "down":
-       y += 20
-   elif direction == "left":
-       x += 20
-   elif direction == "right":
-       x -= 20
-
-
-   return x, y
+# ===========================================================================
+# STARTING GAME
+# ===========================================================================
 
 
+MENU_KEYS = ("Return", "KP_Enter", "x", "X", "r", "R", "m", "M")
 
 
-# ===========================================================================
-# STARTING GAME
-# ===========================================================================
+def unbind_menu_keys():
+   for key in MENU_KEYS:
+       wn.onkey(None, key)
 
 
 def start_game():
-   global game_started, head, food, pen, segments, score, high_score, delay
-   global rotten_food, rotten_active, apple_food, apple_active
-   global reverse_timer, reverse_controls
-   global banana_food, banana_active, current_screen
+   global game_started, model, renderer, hud, high_score, current_screen
    if game_started:
        return  # don't start twice
 
@@ -969,7 +1089,6 @@ def start_game():
    t.clear()
    bg_logo.hideturtle()
    char_logo.hideturtle()
-   pygame.mixer.music.stop()
    play_music()
 
 
@@ -980,11 +1099,14 @@ def start_game():
    # =================================================================================
 
 
-   # Adjust screen for the game
-   wn.clear()
+   # Adjust screen for the game. The screen is not wn.clear()ed: the sprites
+   # and the score text are reused from round to round.
+   unbind_menu_keys()
+   wn.bgcolor("white")
    wn.setup(width=1600, height=820)
    wn.tracer(0)
-   wn.bgpic(backgrounds["Game_BG"])
+   images.load_group("game")
+   images.set_background("Game_BG")
 
 
 
@@ -1005,113 +1127,29 @@ def start_game():
    # =================================================================================
 
 
-   # --- Snake head ---
-   head = turtle.Turtle()
-   head.speed(0)
-   head.shape(sprites["Snake_Up"])
-   head.penup()
-   head.goto(0, 0)
-   head.direction = "stop"
-
-
-   # --- Snake food ---
-   food = turtle.Turtle()
-   food.speed(0)
-   food.shape(sprites["Lemon"])
-   food.color("yellow")
-   food.penup()
-   food.goto(0, 100)
-
-
-   # --- Rotten lemon (danger!) ---
-   global rotten_food, rotten_active
-   rotten_food = turtle.Turtle()
-   rotten_food.speed(0)
-   rotten_food.penup()
-   rotten_food.shape(sprites["Rotten_Lemon"])
-   rotten_food.goto(1000, 1000)
-   rotten_active = False
-
-
-   # --- Second Rotten lemon (danger!) ---
-   global rotten2_food, rotten2_active
-   rotten2_food = turtle.Turtle()
-   rotten2_food.speed(0)
-   rotten2_food.penup()
-   rotten2_food.shape(sprites["Rotten_Lemon"])
-   rotten2_food.goto(1000, 1000)
-   rotten2_active = False
-
-
-   # --- Third Rotten lemon (danger!) ---
-   global rotten3_food, rotten3_active
-   rotten3_food = turtle.Turtle()
-   rotten3_food.speed(0)
-   rotten3_food.penup()
-   rotten3_food.shape(sprites["Rotten_Lemon"])
-   rotten3_food.goto(1000, 1000)
-   rotten3_active = False
-
-
-   # --- Fourth Rotten lemon (danger!) ---
-   global rotten4_food, rotten4_active
-   rotten4_food = turtle.Turtle()
-   rotten4_food.speed(0)
-   rotten4_food.penup()
-   rotten4_food.shape(sprites["Rotten_Lemon"])
-   rotten4_food.goto(1000, 1000)
-   rotten4_active = False
-
-
-   # --- Apple ---
-   global apple_food, apple_active
-   apple_food = turtle.Turtle()
-   apple_food.speed(0)
-   apple_food.penup()
-   apple_food.shape(sprites["Apple"])
-   apple_food.goto(1000, 1000)
-   apple_active = False
-
-
-   # --- Banana ---
-   global banana_food, banana_active
-   banana_food = turtle.Turtle()
-   banana_food.speed(0)
-   banana_food.penup()
-   banana_food.shape(sprites["Banana"])
-   banana_food.goto(1000, 1000)
-   banana_active = False
-
-
-   # --- Snake body segments ---
-   segments = []
-
-
-   D = DIFFICULTY_SETTINGS[difficulty]
-   if D.get("obstacles", False):
-       spawn_obstacles(D.get("obstacle_count", 0))
-   else:
-       clear_obstacles()
+   # --- Game model (all rules and positions) ---
+   tweens.clear()
+   model = GameModel(difficulty, board_limit=board_limit)
+   if debug_overlay is not None:
+       model.profiler = debug_overlay.stats.phases
+
+
+   # --- Sprites for the head, lemon, items, body and spikes ---
+   if renderer is None:
+       renderer = TurtleRenderer()
+       if debug_overlay is not None:
+           renderer.profiler = debug_overlay.stats.phases
+   renderer.start_round(model)
 # =================================================================================
 #   Scoring
 # =================================================================================
 
 
    # --- Score text ---
-   score = 0
    # keep existing high_score from file!
-   delay = 0.1
-
-
-   pen = turtle.Turtle()
-   pen.speed(0)
-   pen.shape("circle")
-   pen.color("black")
-   pen.penup()
-   pen.hideturtle()
-   pen.goto(0, 320)
-   pen.write(f"Current Score: {score}  High Score: {high_score}",
-             align="center", font=("Arial", 24, "bold"))
+   if hud is None:
+       hud = ScoreHud()
+   update_score_display()
 
 
    # =================================================================================
@@ -1154,102 +1192,34 @@ def start_game():
    wn.onkey(options_back, "Escape")
 
 
+   start_game_loop()
 
 
-def opposite_direction(direction: str) -> str:
-   if direction == "up":
-       return "down"
-   if direction == "down":
-       return "up"
-   if direction == "left":
-       return "right"
-   if direction == "right":
-       return "left"
-   return direction
 
 
+def update_score_display():
+   hud.update(model.score, high_score)
 
 
-# --- Functions to control the snake ---
-def go_up():
-   global head, reverse_controls
-   desired = "up"
-   if reverse_controls:
-       desired = "down"  # flipped
-
-
-   # block instant 180° flip so snake cannot kill itself
-   # TODO Sometimes 180 flip still possible, Troubleshoot
-   if head.direction != opposite_direction(desired):
-       head.direction = desired
 
 
+# --- Functions to control the snake ---
+# Presses are queued by GameModel.turn() and taken one per tick; reverse
+# controls and the 180° check are handled there too
+def go_up():
+   model.turn("up", time.perf_counter())
 
 
 def go_down():
-   global head, reverse_controls
-   desired = "down"
-   if reverse_controls:
-       desired = "up"
-
-
-   if head.direction != opposite_direction(desired):
-       head.direction = desired
-
-
+   model.turn("down", time.perf_counter())
 
 
 def go_left():
-   global head, reverse_controls
-   desired = "left"
-   if reverse_controls:
-       desired = "right"
-
-
-   if head.direction != opposite_direction(desired):
-       head.direction = desired
-
-
+   model.turn("left", time.perf_counter())
 
 
 def go_right():
-   global head, reverse_controls
-   desired = "right"
-   if reverse_controls:
-       desired = "left"
-
-
-   if head.direction != opposite_direction(desired):
-       head.direction = desired
-
-
-
-
-
-
-def move():
-   if head.direction == "up":
-       y = head.ycor()
-       head.sety(y + 20)
-       head.shape(sprites["Snake_Up"])
-
-
-   if head.direction == "down":
-       y = head.ycor()
-       head.sety(y - 20)
-       head.shape(sprites["Snake_Down"])
-
-
-   if head.direction == "left":
-       x = head.xcor()
-       head.setx(x - 20)
-       head.shape(sprites["Snake_Left"])
-
-
-   if head.direction == "right":
-       x = head.xcor()
-       head.setx(x + 20)
-       head.shape(sprites["Snake_Right"])
+   model.turn("right", time.perf_counter())
 
 
 
@@ -1286,491 +1256,146 @@ wn.onkey(options_back, "B")
 wn.onkey(options_back, "Escape")
 
 
+wn.onkey(toggle_debug_overlay, "F3")
+
+# The menu is up: load the other screens' images while the player looks at it
+images.load_later("game", "options")
+menu_ready_seconds = time.perf_counter() - launch_time
+
+
 # =================================================================================
 # Game Loop
 # =================================================================================
 
-try:
-    while True:
-        wn.update()
+# Menus, options and the game over screen are driven by Tk's own event loop.
+# Game ticks are only scheduled (with wn.ontimer) while a game is running, so
+# the process sleeps between key presses on every other screen.
+tick_session = 0
 
-        # If we are in OPTIONS, pause all gameplay updates
-        if current_screen == "options":
-            time.sleep(0.05)
-            continue
-
-        # If game hasn't started yet, just idle
-        if not game_started:
-            time.sleep(0.05)
-            continue
-
-        # turn off reverse controls when time is up
-        if reverse_controls and time.time() >= reverse_timer:
-            reverse_controls = False
-
-        # --- Collision with border ---
-        if (head.xcor() > 290 or head.xcor() < -290 or
-                head.ycor() > 290 or head.ycor() < -290):
-            play_sfx("sounds/Death.wav")
-            head_hit_animation()
-            time.sleep(1)
-
-            # Hide snake
-            head.goto(1000, 1000)
-            head.direction = "stop"
-
-            for segment in segments:
-                segment.goto(1000, 1000)
-            segments.clear()
-
-            # Hide items
-            rotten_food.goto(1000, 1000)
-            rotten_active = False
-            rotten2_food.goto(1000, 1000)
-            rotten2_active = False
-            rotten3_food.goto(1000, 1000)
-            rotten3_active = False
-            rotten4_food.goto(1000, 1000)
-            rotten4_active = False
-            apple_food.goto(1000, 1000)
-            apple_active = False
-            banana_food.goto(1000, 1000)
-            banana_active = False
-            reverse_controls = False
-
-            # Leaderboard + highscore
-            if score > 0:
-                maybe_update_leaderboard(score, difficulty)
-                if score > high_score:
-                    high_score = score
-                    save_secure_high_score(high_score)
-
-            # Show Game Over screen
-            show_game_over(score)
-
-            # Prepare values for next round
-            score = 0
-            delay = 0.1
-            continue
-
-        # --- Collision with own body ---
-        for segment in segments:
-            if segment.distance(head) < 20:
-                play_sfx("sounds/Death.wav")
-                head_hit_animation()
-                time.sleep(1)
-
-                head.goto(1000, 1000)
-                head.direction = "stop"
-
-                for segment in segments:
-                    segment.goto(1000, 1000)
-                segments.clear()
-
-                rotten_food.goto(1000, 1000)
-                rotten_active = False
-                rotten2_food.goto(1000, 1000)
-                rotten2_active = False
-                rotten3_food.goto(1000, 1000)
-                rotten3_active = False
-                rotten4_food.goto(1000, 1000)
-                rotten4_active = False
-                apple_food.goto(1000, 1000)
-                apple_active = False
-                banana_food.goto(1000, 1000)
-                banana_active = False
-                reverse_controls = False
-
-                if score > 0:
-                    maybe_update_leaderboard(score, difficulty)
-                    if score > high_score:
-                        high_score = score
-                        save_secure_high_score(high_score)
-
-                show_game_over(score)
-
-                score = 0
-                delay = 0.1
-                break
-
-        if obstacles_active:
-            for ob in obstacles:
-                if head.distance(ob) < 20:
-                    play_sfx("sounds/Death.wav")
-                    head_hit_animation()
-                    time.sleep(1)
-
-                    # Hide snake
-                    head.goto(1000, 1000)
-                    head.direction = "stop"
-
-                    for segment in segments:
-                        segment.goto(1000, 1000)
-                    segments.clear()
-
-                    # Hide items
-                    rotten_food.goto(1000, 1000)
-                    rotten_active = False
-                    rotten2_food.goto(1000, 1000)
-                    rotten2_active = False
-                    rotten3_food.goto(1000, 1000)
-                    rotten3_active = False
-                    rotten4_food.goto(1000, 1000)
-                    rotten4_active = False
-                    apple_food.goto(1000, 1000)
-                    apple_active = False
-                    banana_food.goto(1000, 1000)
-                    banana_active = False
-                    reverse_controls = False
-
-                    # Leaderboard + highscore
-                    if score > 0:
-                        maybe_update_leaderboard(score, difficulty)
-                        if score > high_score:
-                            high_score = score
-                            save_secure_high_score(high_score)
-
-                    # Show Game Over screen
-                    show_game_over(score)
-                    clear_obstacles()
-
-                    # Prepare values for next round
-                    score = 0
-                    delay = 0.1
-                    continue
-
-        # ====================================================================================
-        # ITEMS
-        # ====================================================================================
-        D = DIFFICULTY_SETTINGS[difficulty]
-
-        # --- Collision with good lemon ---
-        if head.distance(food) < 20:
-            play_sfx("sounds/Bite.wav")
-            head_bite_animation()
-
-            # Move food to a safe random spot
-            x, y = random_safe_position(margin=40)
-            food.goto(x, y)
-            start_spawn_animation(food, duration=0.25)
-            play_sfx("sounds/Plop.wav")
-
-            # Add a new segment
-            new_segment = turtle.Turtle()
-            new_segment.speed(0)
-            new_segment.penup()
-
-            # First segment: spawn just behind the head
-            if len(segments) == 0:
-                sx = head.xcor()
-                sy = head.ycor()
-                if head.direction == "up":
-                    sy -= 20
-                elif head.direction == "down":
-                    sy += 20
-                elif head.direction == "left":
-                    sx += 20
-                elif head.direction == "right":
-                    sx -= 20
-                new_segment.goto(sx, sy)
-            else:
-                # Later segments: spawn off-screen, will snap into place
-                new_segment.goto(1000, 1000)
-
-            segments.append(new_segment)
-
-            # --- Rotten lemon 1 spawn ---
-            if random.random() < D["spawn_rotten"]:
-                rx, ry = random_safe_position(margin=40)
-                rotten_food.goto(rx, ry)
-                rotten_active = True
-            else:
-                rotten_food.goto(1000, 1000)
-                rotten_active = False
-
-            # --- Rotten lemon 2 spawn ---
-            if random.random() < D["spawn_rotten2"]:
-                rx, ry = random_safe_position(margin=40)
-                rotten2_food.goto(rx, ry)
-                rotten2_active = True
-            else:
-                rotten2_food.goto(1000, 1000)
-                rotten2_active = False
-
-            # --- Rotten lemon 3 spawn ---
-            if random.random() < D.get("spawn_rotten3", 0.0):
-                rx, ry = random_safe_position(margin=40)
-                rotten3_food.goto(rx, ry)
-                rotten3_active = True
-            else:
-                rotten3_food.goto(1000, 1000)
-                rotten3_active = False
-
-            # --- Rotten lemon 4 spawn ---
-            if random.random() < D.get("spawn_rotten4", 0.0):
-                rx, ry = random_safe_position(margin=40)
-                rotten4_food.goto(rx, ry)
-                rotten4_active = True
-            else:
-                rotten4_food.goto(1000, 1000)
-                rotten4_active = False
-
-            # Chance for banana to spawn
-            if random.random() < D["spawn_banana"]:
-                rx, ry = random_safe_position(margin=40)
-                banana_food.goto(rx, ry)
-                banana_active = True
-            else:
-                banana_food.goto(1000, 1000)
-                banana_active = False
-
-            # Chance for apple to spawn
-            if random.random() < D["spawn_apple"]:
-                rx, ry = random_safe_position(margin=40)
-                apple_food.goto(rx, ry)
-                apple_active = True
-            else:
-                apple_food.goto(1000, 1000)
-                apple_active = False
-
-            # Shorten delay (speed up)
-            delay = max(0.03, delay - D["speed_bonus"])
-
-            # Increase score by 1
-            score += 1
-            if score > high_score:
-                high_score = score
-                save_secure_high_score(high_score)
-
-            pen.clear()
-            pen.write(f"Current Score: {score}  High Score: {high_score}",
-                      align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with Banana (check EVERY frame) ---
-        if banana_active and head.distance(banana_food) < 20:
-            play_sfx("sounds/Hmmm.wav")
-            score += 10
-            if score > high_score:
-                high_score = score
-                save_secure_high_score(high_score)
-
-            delay = max(0.03, delay - D["speed_bonus"])
-            banana_food.goto(1000, 1000)
-            banana_active = False
-
-            pen.clear()
-            pen.write(f"Current Score: {score}  High Score: {high_score}",
-                      align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with Apple(check EVERY frame) ---
-        if apple_active and head.distance(apple_food) < 20:
-            play_sfx("sounds/Hmmm.wav")
-            reverse_controls = True
-            reverse_timer = time.time() + 5
-
-            score += 5
-            if score > high_score:
-                high_score = score
-                save_secure_high_score(high_score)
-
-            apple_food.goto(1000, 1000)
-            apple_active = False
-
-            pen.clear()
-            pen.write(f"Current Score: {score}  High Score: {high_score}",
-                      align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with rotten lemon 1 (check EVERY frame) ---
-        if rotten_active and head.distance(rotten_food) < 20:
-            play_sfx("sounds/Blegh.wav")
-            score -= 5
-            rotten_food.goto(1000, 1000)
-            rotten_active = False
-            reverse_controls = False
-
-            if score < 0:
-                play_sfx("sounds/Death.wav")
-                head_hit_animation()
-                time.sleep(1)
-
-                head.goto(1000, 1000)
-                head.direction = "stop"
-                for segment in segments:
-                    segment.goto(1000, 1000)
-                segments.clear()
-
-                rotten_food.goto(1000, 1000); rotten_active = False
-                rotten2_food.goto(1000, 1000); rotten2_active = False
-                rotten3_food.goto(1000, 1000); rotten3_active = False
-                rotten4_food.goto(1000, 1000); rotten4_active = False
-                apple_food.goto(1000, 1000); apple_active = False
-                banana_food.goto(1000, 1000); banana_active = False
-                reverse_controls = False
-
-                if score > 0:
-                    maybe_update_leaderboard(score, difficulty)
-                    if score > high_score:
-                        high_score = score
-                        save_secure_high_score(high_score)
-
-                show_game_over(score)
-                score = 0
-                delay = 0.1
-            else:
-                pen.clear()
-                pen.write(f"Current Score: {score}  High Score: {high_score}",
-                          align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with rotten lemon 2 (check EVERY frame) ---
-        if rotten2_active and head.distance(rotten2_food) < 20:
-            play_sfx("sounds/Blegh.wav")
-            score -= 5
-            rotten2_food.goto(1000, 1000)
-            rotten2_active = False
-            reverse_controls = False
-
-            if score < 0:
-                play_sfx("sounds/Death.wav")
-                head_hit_animation()
-                time.sleep(1)
-
-                head.goto(1000, 1000)
-                head.direction = "stop"
-                for segment in segments:
-                    segment.goto(1000, 1000)
-                segments.clear()
-
-                rotten_food.goto(1000, 1000); rotten_active = False
-                rotten2_food.goto(1000, 1000); rotten2_active = False
-                rotten3_food.goto(1000, 1000); rotten3_active = False
-                rotten4_food.goto(1000, 1000); rotten4_active = False
-                apple_food.goto(1000, 1000); apple_active = False
-                banana_food.goto(1000, 1000); banana_active = False
-                reverse_controls = False
-
-                if score > 0:
-                    maybe_update_leaderboard(score, difficulty)
-                    if score > high_score:
-                        high_score = score
-                        save_secure_high_score(high_score)
-
-                show_game_over(score)
-                clear_obstacles()
-                score = 0
-                delay = 0.1
-            else:
-                pen.clear()
-                pen.write(f"Current Score: {score}  High Score: {high_score}",
-                          align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with third rotten lemon ---
-        if rotten3_active and head.distance(rotten3_food) < 20:
-            play_sfx("sounds/Blegh.wav")
-            score -= 5
-            rotten3_food.goto(1000, 1000)
-            rotten3_active = False
-            reverse_controls = False
-
-            if score < 0:
-                play_sfx("sounds/Death.wav")
-                head_hit_animation()
-                time.sleep(1)
-
-                head.goto(1000, 1000)
-                head.direction = "stop"
-                for segment in segments:
-                    segment.goto(1000, 1000)
-                segments.clear()
-
-                rotten_food.goto(1000, 1000); rotten_active = False
-                rotten2_food.goto(1000, 1000); rotten2_active = False
-                rotten3_food.goto(1000, 1000); rotten3_active = False
-                apple_food.goto(1000, 1000); apple_active = False
-                banana_food.goto(1000, 1000); banana_active = False
-                reverse_controls = False
-
-                if score > 0:
-                    maybe_update_leaderboard(score, difficulty)
-                    if score > high_score:
-                        high_score = score
-                        save_secure_high_score(high_score)
-
-                show_game_over(score)
-                clear_obstacles()
-                score = 0
-                delay = 0.1
-            else:
-                pen.clear()
-                pen.write(f"Current Score: {score}  High Score: {high_score}",
-                          align="center", font=("Arial", 24, "bold"))
-
-        # --- Collision with fourth rotten lemon ---
-        if rotten4_active and head.distance(rotten4_food) < 20:
-            play_sfx("sounds/Blegh.wav")
-            score -= 5
-            rotten4_food.goto(1000, 1000)
-            rotten4_active = False
-            reverse_controls = False
-
-            if score < 0:
-                play_sfx("sounds/Death.wav")
-                head_hit_animation()
-                time.sleep(1)
-
-                head.goto(1000, 1000)
-                head.direction = "stop"
-                for segment in segments:
-                    segment.goto(1000, 1000)
-                segments.clear()
-
-                rotten_food.goto(1000, 1000); rotten_active = False
-                rotten2_food.goto(1000, 1000); rotten2_active = False
-                rotten3_food.goto(1000, 1000); rotten3_active = False
-                rotten4_food.goto(1000, 1000); rotten4_active = False
-                apple_food.goto(1000, 1000); apple_active = False
-                banana_food.goto(1000, 1000); banana_active = False
-                reverse_controls = False
-
-                if score > 0:
-                    maybe_update_leaderboard(score, difficulty)
-                    if score > high_score:
-                        high_score = score
-                        save_secure_high_score(high_score)
-
-                show_game_over(score)
-                clear_obstacles()
-                score = 0
-                delay = 0.1
-            else:
-                pen.clear()
-                pen.write(f"Current Score: {score}  High Score: {high_score}",
-                          align="center", font=("Arial", 24, "bold"))
-
-        # =================================================================================
-        # Movement
-        # =================================================================================
-        for index in range(len(segments) - 1, 0, -1):
-            x = segments[index - 1].xcor()
-            y = segments[index - 1].ycor()
-            segments[index].goto(x, y)
-
-        if len(segments) > 0:
-            x = head.xcor()
-            y = head.ycor()
-            segments[0].goto(x, y)
-
-        move()
-        update_body_sprites()
-        update_spawn_animations()
-
-        time.sleep(delay)
 
+def start_game_loop():
+   global tick_session
+   tick_session += 1
+   clock.reset()
+   if debug_overlay is not None:
+       debug_overlay.stats.reset()  # don't count the pause before this loop as a frame
+   schedule_game_tick(tick_session, 0.0)
+
+
+def schedule_game_tick(session_id, seconds):
+   # Round up, so the timer never fires just before the tick is due and spins
+   wn.ontimer(lambda: game_tick(session_id), max(1, math.ceil(seconds * 1000)))
+
+
+def end_round():
+   global high_score
+
+   # Hide snake and items
+   renderer.hide_round()
+
+   # Keep the seed and inputs of this round so it can be replayed
+   try:
+       save_replay(model, LAST_REPLAY_FILE)
+   except (OSError, struct.error):
+       pass
+
+   # Leaderboard + highscore
+   score = model.score
+   if score > 0:
+       maybe_update_leaderboard(score, difficulty)
+       if score > high_score:
+           high_score = score
+           save_secure_high_score(high_score)
+
+   # Show Game Over screen
+   show_game_over(score)
+
+
+def game_tick(session_id):
+   global high_score
+
+   try:
+       # A newer loop took over, the game ended, or OPTIONS paused gameplay
+       if session_id != tick_session or not game_started or current_screen != "game":
+           return
+
+       # Time every phase of this frame while the debug overlay is on
+       stats = debug_overlay.stats if debug_overlay is not None else None
+       if stats:
+           stats.begin_frame()
+
+       # Run every game tick that is due since the last frame
+       last_score = model.score
+       events = []
+       clock.begin_frame()
+       while model.alive and clock.consume(model.delay):
+           events.extend(model.step())
+       renderer.draw(model)
+
+       if "bite" in events:
+           play_sfx("sounds/Bite.wav")
+           head_bite_animation()
+           start_spawn_animation(renderer.food, duration=0.25)
+           play_sfx("sounds/Plop.wav")
+
+       for event in events:
+           if event in ITEM_KINDS:
+               play_sfx(ITEM_KINDS[event]["sound"])
+
+       if model.score != last_score:
+           if model.score > high_score:
+               high_score = model.score
+               save_secure_high_score(high_score)
+           update_score_display()
+
+       if "death" in events:
+           # Wiggle, hold for a second, then end the round; frames keep running meanwhile
+           play_sfx("sounds/Death.wav")
+           wiggle_time = head_hit_animation()
+           tweens.start("death", [(wiggle_time + 1.0, end_round)])
+       if stats:
+           stats.phases.lap("sounds+score")
+
+       # Play due animation keyframes; the death tween ends the round from here
+       tweens.advance()
+       update_spawn_animations()
+       if stats:
+           stats.phases.lap("animations")
+           debug_overlay.refresh()
+           stats.phases.lap("overlay")
+       flush_canvas_sprites()
+       wn.update()
+       if stats:
+           stats.phases.lap("wn.update")
+           stats.end_frame()
+
+       # Key press to the turn being on screen
+       if model.turn_stamps:
+           if stats:
+               stats.record_input_latency(model.turn_stamps)
+           model.turn_stamps.clear()
+
+       # Next frame: the next game tick or the next animation keyframe, whichever is first
+       waits = [clock.time_to_next_tick(model.delay)] if model.alive else []
+       tween_wait = tweens.time_to_next()
+       if tween_wait is not None:
+           waits.append(tween_wait)
+       if waits:
+           schedule_game_tick(session_id, min(waits))
+
+   except (turtle.Terminator, tk.TclError):
+       return
+
+
+try:
+    wn.mainloop()
 except (turtle.Terminator, tk.TclError):
-    try:
-        pygame.mixer.quit()
-    except:
-        pass
-    raise SystemExit
+    pass
+
+try:
+    pygame.mixer.quit()
+except:
+    pass
 
 # ====================================================================================
 # Catch That Lemon Game by Dave Luisterburg. V0.3.0
@@ -0,0 +1,552 @@
+"""
+Catch That Lemon drawn with pygame instead of turtle/Tk.
+
+    python CatchThatLemonGame.py --renderer pygame
+
+The same sprites/ and backgrounds/ GIFs are loaded once as converted Surfaces.
+Game sprites are DirtySprites in one LayeredDirty group, so a frame only
+clears and blits what moved and only those rectangles are pushed to the
+display. This is meant for machines where Tk canvas redraws are the bottleneck.
+
+The screens are kept simple: the options screen only has the music volume,
+and there are no bite or death tweens. Everything else (rules, sounds, high
+score, leaderboards, replays) is shared with the turtle version.
+"""
+
+import functools
+import os
+import struct
+import time
+
+import pygame
+
+from CatchThatLemonCore import (
+    BoardRenderer,
+    CELL,
+    FixedStepClock,
+    GameModel,
+    ITEM_KINDS,
+    SpritePool,
+    save_replay,
+)
+from CatchThatLemonAudio import GAME_MUSIC, MENU_MUSIC, SFX_FILES, MusicManager, SoundBank
+from CatchThatLemonSave import (
+    LAST_REPLAY_FILE,
+    MAX_LEADERBOARD_ENTRIES,
+    load_secure_high_score,
+    save_secure_high_score,
+    load_secure_leaderboard,
+    save_secure_leaderboard,
+)
+
+
+WINDOW_SIZE = (1600, 820)   # same window as the turtle screen
+MENU_FPS = 30               # menus only wait for keys
+DIFFICULTIES = ["Classic", "Easy", "Medium", "Hard"]
+VOLUME_STEP = 0.05
+NAME_MAX = 16               # characters in a leaderboard name
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: "up", pygame.K_w: "up",
+    pygame.K_DOWN: "down", pygame.K_s: "down",
+    pygame.K_LEFT: "left", pygame.K_a: "left",
+    pygame.K_RIGHT: "right", pygame.K_d: "right",
+}
+
+
+# ==================================================================================
+# Images
+# ==================================================================================
+
+
+def load_images(folder):
+    """Every GIF in `folder` as a Surface converted to the display format, by name."""
+    result = {}
+    if not os.path.isdir(folder):
+        print(f"Warning: folder '{folder}' not found.")
+        return result
+
+    for filename in os.listdir(folder):
+        if filename.lower().endswith(".gif"):
+            path = os.path.join(folder, filename)
+            key = os.path.splitext(filename)[0]  # "Lemon.gif" -> "Lemon"
+            result[key] = pygame.image.load(path).convert_alpha()
+    return result
+
+
+class Images:
+    """Loaded Surfaces; a missing sprite is drawn as a grey square instead of crashing."""
+
+    def __init__(self):
+        self.sprites = load_images("sprites")
+        self.backgrounds = load_images("backgrounds")
+
+    def sprite(self, name):
+        image = self.sprites.get(name)
+        if image is None:
+            print(f"Warning: sprite '{name}' not found.")
+            image = pygame.Surface((CELL, CELL))
+            image.fill((128, 128, 128))
+            self.sprites[name] = image
+        return image
+
+    def background(self, name):
+        """The background centred on a window sized Surface, like wn.bgpic() does."""
+        surface = pygame.Surface(WINDOW_SIZE).convert()
+        surface.fill((255, 255, 255) if name == "Game_BG" else (0, 0, 0))
+        image = self.backgrounds.get(name)
+        if image is not None:
+            surface.blit(image, image.get_rect(center=surface.get_rect().center))
+        return surface
+
+
+def to_screen(pos):
+    """Turtle coordinates (origin in the middle, y up) to window pixels."""
+    x, y = pos
+    return WINDOW_SIZE[0] // 2 + x, WINDOW_SIZE[1] // 2 - y
+
+
+# ==================================================================================
+# Sprites
+# ==================================================================================
+
+
+class PygameSprite(pygame.sprite.DirtySprite):
+    """
+    The Sprite interface on a DirtySprite. Changing the shape, position or
+    visibility marks it dirty, and LayeredDirty only redraws dirty sprites.
+
+    show()/hide() say whether the thing it draws is in play; blink() is the
+    spawn animation flashing it. It is only visible when both agree.
+    """
+
+    def __init__(self, display, shape_name):
+        super().__init__()
+        self.display = display
+        self.shape = None
+        self.pos = (0, 0)
+        self.active = True
+        self.blinked_out = False
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.set_shape(shape_name)
+        self.attach()
+
+    def set_shape(self, shape_name):
+        if shape_name != self.shape:
+            self.shape = shape_name
+            self.image = self.display.images.sprite(shape_name)
+            self.rect = self.image.get_rect(center=to_screen(self.pos))
+            self.dirty = 1
+
+    def goto(self, pos):
+        if pos != self.pos:
+            self.pos = pos
+            self.rect.center = to_screen(pos)
+            self.dirty = 1
+
+    def show(self):
+        self.active = True
+        self.refresh()
+
+    def hide(self):
+        self.active = False
+        self.refresh()
+
+    def blink(self, on):
+        self.blinked_out = not on
+        self.refresh()
+
+    def refresh(self):
+        visible = int(self.active and not self.blinked_out)
+        if visible != self.visible:
+            self.visible = visible
+            self.dirty = 1
+
+    def destroy(self):
+        self.kill()
+
+    def attach(self):
+        self.display.group.add(self)
+
+    def detach(self):
+        # The group redraws the background where it was on the next frame
+        self.display.group.remove(self)
+
+
+class TextSprite(pygame.sprite.DirtySprite):
+    """One line of text, centred on a turtle position. Only re-rendered when the text changes."""
+
+    def __init__(self, display, pos, size, color, bold=True):
+        super().__init__()
+        self.font = pygame.font.SysFont("Arial", size, bold=bold)
+        self.color = color
+        self.center = to_screen(pos)
+        self.text = None
+        self.set_text("")
+        display.group.add(self, layer=1)
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.image = self.font.render(text, True, self.color)
+        self.rect = self.image.get_rect(center=self.center)
+        self.dirty = 1
+
+
+class EdgeSprite(pygame.sprite.DirtySprite):
+    """One side of the board outline: a black bar clipped to the window."""
+
+    def __init__(self, display):
+        super().__init__()
+        self.image = pygame.Surface((0, 0))
+        self.rect = self.image.get_rect()
+        self.visible = 0
+        display.group.add(self)
+
+    def place(self, rect):
+        rect = rect.clip(pygame.Rect((0, 0), WINDOW_SIZE))
+        if rect == self.rect and self.visible:
+            return
+        if rect.size != self.image.get_size():
+            self.image = pygame.Surface(rect.size)
+        self.rect = rect
+        self.visible = int(rect.width > 0 and rect.height > 0)
+        self.dirty = 1
+
+    def hide(self):
+        if self.visible:
+            self.visible = 0
+            self.dirty = 1
+
+
+class PygameRenderer(BoardRenderer):
+    """
+    The board drawn with pool sprites in the display's group.
+    Boards other than the one Game_BG frames get four bar sprites as their outline.
+    """
+
+    EDGE_WIDTH = 3
+
+    def __init__(self, display):
+        self.edges = [EdgeSprite(display) for _ in range(4)]
+        super().__init__(display.pool)
+
+    def draw_edge(self, m):
+        edge = self.board_edge(m)
+        if edge is None:
+            self.hide_edge()
+            return
+
+        left, top, right, bottom = edge
+        x0, y0 = to_screen((left, top))
+        x1, y1 = to_screen((right, bottom))
+        w = self.EDGE_WIDTH
+        sides = (
+            pygame.Rect(x0 - 1, y0 - 1, x1 - x0 + w, w),   # top
+            pygame.Rect(x0 - 1, y1 - 1, x1 - x0 + w, w),   # bottom
+            pygame.Rect(x0 - 1, y0 - 1, w, y1 - y0 + w),   # left
+            pygame.Rect(x1 - 1, y0 - 1, w, y1 - y0 + w),   # right
+        )
+        for sprite, rect in zip(self.edges, sides):
+            sprite.place(rect)
+
+    def hide_edge(self):
+        for sprite in self.edges:
+            sprite.hide()
+
+
+# ==================================================================================
+# Display
+# ==================================================================================
+
+
+class Display:
+    """
+    The window, the sprite group and the dirty rectangle bookkeeping.
+    A screen switch blits the new background once; after that every frame
+    only pushes the rectangles the group redrew.
+    """
+
+    def __init__(self):
+        self.screen = pygame.display.set_mode(WINDOW_SIZE)
+        pygame.display.set_caption("Catch that Lemon V0.3.1 Demo Version")
+        self.images = Images()
+        self.group = pygame.sprite.LayeredDirty()
+        self.pool = SpritePool(functools.partial(PygameSprite, self))
+        self.backgrounds = {}
+
+    def set_background(self, name):
+        background = self.backgrounds.get(name)
+        if background is None:
+            background = self.backgrounds[name] = self.images.background(name)
+        self.group.clear(self.screen, background)
+        self.screen.blit(background, (0, 0))
+        self.group.repaint_rect(self.screen.get_rect())
+
+    def update(self):
+        rects = self.group.draw(self.screen)
+        if rects:
+            pygame.display.update(rects)
+
+
+# ==================================================================================
+# Game
+# ==================================================================================
+
+
+class PygameGame:
+    """Menu, game and game over screens driven by one pygame event loop."""
+
+    def __init__(self, board_limit):
+        self.board_limit = board_limit
+        self.display = Display()
+        self.clock = FixedStepClock()
+        self.frame_clock = pygame.time.Clock()
+        self.difficulty = "Easy"
+        self.high_score = load_secure_high_score()
+        self.model = None
+        self.renderer = None
+        self.screen_name = None
+        self.back_to = "menu"       # where the options screen goes back to
+        self.death_time = 0.0
+        self.volume = 1.0
+        self.name = ""              # leaderboard name being typed
+        self.running = True
+
+        self.title = TextSprite(self.display, (0, 120), 40, (255, 255, 255))
+        self.lines = [TextSprite(self.display, (0, y), 22, (255, 255, 255), bold=False)
+                      for y in (40, -10, -80, -120)]
+        self.hud = TextSprite(self.display, (0, 337), 24, (0, 0, 0))
+        self.footer = TextSprite(self.display, (0, -300), 22, (0, 0, 0))
+
+        try:
+            self.sounds = SoundBank()
+            self.sounds.preload_in_background(SFX_FILES)
+            self.music = MusicManager()
+        except pygame.error as e:
+            print(f"Warning: no sound: {e}")
+            self.sounds = self.music = None
+
+    def play_sfx(self, filename):
+        if self.sounds is not None:
+            self.sounds.play(filename)
+
+    def play_music(self, filename):
+        if self.music is not None:
+            self.music.play(filename)
+
+    def set_text(self, title="", lines=(), hud="", footer=""):
+        self.title.set_text(title)
+        for sprite, text in zip(self.lines, list(lines) + [""] * len(self.lines)):
+            sprite.set_text(text)
+        self.hud.set_text(hud)
+        self.footer.set_text(footer)
+
+    # -- Screens --
+
+    def show_menu(self):
+        self.screen_name = "menu"
+        self.display.set_background("MenuScreen")
+        self.play_music(MENU_MUSIC)
+        self.set_text(footer=f"Difficulty: {self.difficulty}  (Press X to change)",
+                      lines=["", "", "Press O for Options", "Press ENTER to play, ESC to quit"])
+
+    def show_options_menu(self):
+        self.screen_name = "options"
+        self.display.set_background("Options_BG")
+        bar_length = int(self.volume * 20)
+        bar = "[" + "#" * bar_length + "-" * (20 - bar_length) + "]"
+        self.set_text("OPTIONS", [
+            "Music Volume",
+            f"{bar}  {round(self.volume * 100)}%",
+            "A / Left: -   |   D / Right: +",
+            "Press B or ESC to go back",
+        ])
+
+    def change_volume(self, step):
+        self.volume = round(max(0.0, min(1.0, self.volume + step)), 2)
+        if self.music is not None:
+            self.music.set_volume(self.volume)
+        self.play_sfx("sounds/Plop.wav")
+        self.show_options_menu()
+
+    def options_back(self):
+        if self.back_to == "game_over":
+            self.show_game_over()
+        else:
+            self.show_menu()
+
+    def start_game(self):
+        self.screen_name = "game"
+        self.display.set_background("Game_BG")
+        self.play_music(GAME_MUSIC)
+        self.set_text()
+
+        self.model = GameModel(self.difficulty, board_limit=self.board_limit)
+        if self.renderer is None:
+            self.renderer = PygameRenderer(self.display)
+        self.renderer.start_round(self.model)
+        self.update_score()
+        self.clock.reset()
+
+    def show_game_over(self):
+        self.screen_name = "game_over"
+        self.renderer.hide_round()
+        self.display.set_background("")
+        self.set_text("GAME OVER", [
+            f"Your score: {self.model.score}",
+            f"Best score: {self.high_score}",
+            "Press R to Retry!",
+            "Press M for Main Menu!",
+        ])
+
+    def end_round(self):
+        try:
+            save_replay(self.model, LAST_REPLAY_FILE)
+        except (OSError, struct.error):
+            pass
+        if self.qualifies_for_leaderboard(self.model.score):
+            self.renderer.hide_round()
+            self.name = ""
+            self.show_name_entry()
+        else:
+            self.show_game_over()
+
+    def qualifies_for_leaderboard(self, score):
+        if score <= 0:
+            return False
+        entries = load_secure_leaderboard(self.difficulty)
+        return len(entries) < MAX_LEADERBOARD_ENTRIES or score > entries[-1][1]
+
+    def show_name_entry(self):
+        self.screen_name = "name_entry"
+        self.display.set_background("")
+        self.set_text("New Leaderboard Score!", [
+            f"[{self.difficulty}] You scored {self.model.score}!",
+            "Enter your name:",
+            self.name + "_",
+            "Press ENTER to save",
+        ])
+
+    def save_leaderboard_name(self):
+        name = self.name.strip() or "Player"
+        entries = load_secure_leaderboard(self.difficulty)
+        entries.append((name, self.model.score))
+        entries.sort(key=lambda e: e[1], reverse=True)
+        save_secure_leaderboard(entries, self.difficulty)
+        self.show_game_over()
+
+    def update_score(self):
+        if self.model.score > self.high_score:
+            self.high_score = self.model.score
+            save_secure_high_score(self.high_score)
+        self.hud.set_text(f"Current Score: {self.model.score}  High Score: {self.high_score}")
+
+    # -- Input --
+
+    def on_key(self, event):
+        key = event.key
+        if self.screen_name == "name_entry":
+            self.on_name_key(event)
+        elif self.screen_name == "options":
+            if key in (pygame.K_d, pygame.K_RIGHT):
+                self.change_volume(VOLUME_STEP)
+            elif key in (pygame.K_a, pygame.K_LEFT):
+                self.change_volume(-VOLUME_STEP)
+            elif key in (pygame.K_b, pygame.K_ESCAPE):
+                self.options_back()
+        elif key == pygame.K_ESCAPE and self.screen_name != "game":
+            self.running = False
+        elif key == pygame.K_o and self.screen_name in ("menu", "game_over"):
+            self.back_to = self.screen_name
+            self.show_options_menu()
+        elif self.screen_name == "menu":
+            if key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.start_game()
+            elif key == pygame.K_x:
+                i = DIFFICULTIES.index(self.difficulty)
+                self.difficulty = DIFFICULTIES[(i + 1) % len(DIFFICULTIES)]
+                self.play_sfx("sounds/Plop.wav")
+                self.show_menu()
+        elif self.screen_name == "game":
+            if key in KEY_DIRECTIONS:
+                self.model.turn(KEY_DIRECTIONS[key], time.perf_counter())
+            elif key == pygame.K_ESCAPE:
+                self.renderer.hide_round()
+                self.show_menu()
+        elif self.screen_name == "game_over":
+            if key == pygame.K_r:
+                self.start_game()
+            elif key == pygame.K_m:
+                self.show_menu()
+
+    def on_name_key(self, event):
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_ESCAPE):
+            # Like the turtle version: no name is saved as "Player"
+            if event.key == pygame.K_ESCAPE:
+                self.name = ""
+            self.save_leaderboard_name()
+            return
+        if event.key == pygame.K_BACKSPACE:
+            self.name = self.name[:-1]
+        elif (event.unicode and event.unicode.isprintable() and event.unicode != "|"
+              and len(self.name) < NAME_MAX):
+            # "|" separates the fields in the leaderboard file
+            self.name += event.unicode
+        self.show_name_entry()
+
+    # -- Loop --
+
+    def tick(self):
+        """Run the game ticks due since the last frame. Returns how long until the next one."""
+        m = self.model
+        last_score = m.score
+        events = []
+        self.clock.begin_frame()
+        while m.alive and self.clock.consume(m.delay):
+            events.extend(m.step())
+        self.renderer.draw(m)
+
+        if "bite" in events:
+            self.play_sfx("sounds/Bite.wav")
+            self.play_sfx("sounds/Plop.wav")
+        for event in events:
+            if event in ITEM_KINDS:
+                self.play_sfx(ITEM_KINDS[event]["sound"])
+        if m.score != last_score:
+            self.update_score()
+        if "death" in events:
+            self.play_sfx("sounds/Death.wav")
+            self.death_time = time.perf_counter() + 1.0
+        if not m.alive and time.perf_counter() >= self.death_time:
+            self.end_round()
+            return None
+        return self.clock.time_to_next_tick(m.delay) if m.alive else 0.05
+
+    def run(self):
+        self.show_menu()
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    self.on_key(event)
+
+            wait = None
+            if self.screen_name == "game":
+                wait = self.tick()
+            self.display.update()
+
+            if wait is None:
+                self.frame_clock.tick(MENU_FPS)
+            elif wait > 0:
+                time.sleep(wait)
+
+
+def main(options):
+    pygame.init()
+    try:
+        PygameGame(options.board).run()
+    finally:
+        pygame.quit()
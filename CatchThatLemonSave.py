@@ -0,0 +1,99 @@
+"""
+Catch That Lemon save files: high score, leaderboards and the last replay.
+
+Everything lives in the CatchThatLemon folder under %APPDATA% (or the home
+folder). Scores are stored with a sha256 checksum so edited files are ignored.
+Nothing here needs a window, so tools and benchmarks can import it.
+"""
+
+import hashlib
+import os
+
+
+def get_save_path(filename):
+    base = os.getenv("APPDATA") or os.path.expanduser("~")
+    save_dir = os.path.join(base, "CatchThatLemon")
+    os.makedirs(save_dir, exist_ok=True)
+    return os.path.join(save_dir, filename)
+
+
+MAX_LEADERBOARD_ENTRIES = 5
+SECURE_HIGH_SCORE_FILE = get_save_path("highscore_secure.dat")
+
+# The last finished round, replayable with: python CatchThatLemonCore.py --replay <file>
+LAST_REPLAY_FILE = get_save_path("last_round.ctlr")
+
+
+# ==================================================================================
+# High Score
+# ==================================================================================
+
+
+def save_secure_high_score(score: int):
+    score_str = str(int(score))
+    checksum = hashlib.sha256(score_str.encode()).hexdigest()
+    with open(SECURE_HIGH_SCORE_FILE, "w") as f:
+        f.write(score_str + "|" + checksum)
+
+
+def load_secure_high_score() -> int:
+    try:
+        text = open(SECURE_HIGH_SCORE_FILE).read().strip()
+        if "|" not in text:
+            return 0
+
+        score_str, checksum = text.split("|")
+
+        # Validate checksum
+        expected = hashlib.sha256(score_str.encode()).hexdigest()
+        if checksum == expected:
+            return int(score_str)
+        else:
+            print("⚠ High Score file was tampered with — resetting!")
+            return 0
+    except:
+        return 0
+
+
+# ==================================================================================
+# Leaderboards
+# ==================================================================================
+
+
+def leaderboard_file_for(diff: str) -> str:
+    diff = diff.lower()
+    return get_save_path(f"leaderboard_{diff}.dat")  # uses your AppData helper
+
+
+def save_secure_leaderboard(entries, diff: str):
+    path = leaderboard_file_for(diff)
+    with open(path, "w", encoding="utf-8") as f:
+        for name, score in entries[:MAX_LEADERBOARD_ENTRIES]:
+            payload = f"{name}|{score}"
+            checksum = hashlib.sha256(payload.encode()).hexdigest()
+            f.write(payload + "|" + checksum + "\n")
+
+
+def load_secure_leaderboard(diff: str):
+    path = leaderboard_file_for(diff)
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                parts = line.split("|")
+                if len(parts) != 3:
+                    continue
+                name, score_str, checksum = parts
+                payload = f"{name}|{score_str}"
+                expected = hashlib.sha256(payload.encode()).hexdigest()
+                if checksum != expected:
+                    continue
+                try:
+                    entries.append((name, int(score_str)))
+                except:
+                    pass
+    except FileNotFoundError:
+        return []
+
+    return sorted(entries, key=lambda e: e[1], reverse=True)
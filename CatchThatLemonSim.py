@@ -0,0 +1,249 @@
+"""
+Batch simulator for tuning DIFFICULTY_SETTINGS.
+
+Plays thousands of headless rounds per difficulty with a bot, spread over all
+cores, and reports how score, survival and cause of death are distributed.
+
+    python CatchThatLemonSim.py --games 5000
+    python CatchThatLemonSim.py -d Hard --set Hard.spawn_rotten=0.5 --bot careful
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from CatchThatLemonCore import (
+    DIFFICULTY_SETTINGS,
+    DIRECTIONS,
+    ITEM_KINDS,
+    GameModel,
+    opposite_direction,
+)
+
+
+MAX_TICKS = 20000   # rounds still alive after this many ticks end as "timeout"
+CHUNK_SIZE = 50     # games per worker task
+LOOK_AHEAD_CELLS = 48   # room the careful bot wants ahead of it, at most
+
+
+# ==================================================================================
+# Bots
+# ==================================================================================
+
+# A bot looks at the model and returns the direction it wants to move in,
+# as the player would see it (the simulator undoes reverse controls for it).
+
+
+def random_bot(model, rng):
+    """Mashes the arrow keys."""
+    return rng.choice(list(DIRECTIONS))
+
+
+def is_deadly(model, cell):
+    x, y = cell
+    if abs(x) > model.limit_x or abs(y) > model.limit_y:
+        return True
+    what = model.grid.get(cell)
+    if what == "snake":
+        # The tail moves out of the way this tick unless the snake is growing
+        return not (model.grow == 0 and model.segments and cell == model.segments[-1])
+    if what == "spike":
+        return True
+    if what in model.slot_kinds:
+        return model.score + ITEM_KINDS[model.slot_kinds[what]]["score"] < 0
+    return False
+
+
+def room_from(model, start, limit):
+    """How many cells can be reached from `start`, counting up to `limit`."""
+    seen = {start}
+    todo = [start]
+    while todo and len(seen) < limit:
+        x, y = todo.pop()
+        for dx, dy in DIRECTIONS.values():
+            cell = (x + dx, y + dy)
+            if cell not in seen and not is_deadly(model, cell):
+                seen.add(cell)
+                todo.append(cell)
+    return len(seen)
+
+
+def greedy_bot(model, rng):
+    """Heads straight for the lemon, only avoiding moves that kill it right away."""
+    return best_move(model, rng, look_ahead=False)
+
+
+def careful_bot(model, rng):
+    """Heads for the lemon, but never into a pocket too small for its body."""
+    return best_move(model, rng, look_ahead=True)
+
+
+def best_move(model, rng, look_ahead):
+    hx, hy = model.head
+    fx, fy = model.food if model.food is not None else model.head
+    length = len(model.segments) + 1
+
+    best, best_rank = None, None
+    for direction, (dx, dy) in DIRECTIONS.items():
+        if direction == opposite_direction(model.direction):
+            continue
+        cell = (hx + dx, hy + dy)
+        deadly = is_deadly(model, cell)
+        need = min(length, LOOK_AHEAD_CELLS)
+        trapped = look_ahead and not deadly and room_from(model, cell, need + 1) <= need
+        distance = abs(cell[0] - fx) + abs(cell[1] - fy)
+        rank = (deadly, trapped, distance, rng.random())
+        if best_rank is None or rank < best_rank:
+            best, best_rank = direction, rank
+    return best
+
+
+BOTS = {
+    "random": random_bot,
+    "greedy": greedy_bot,
+    "careful": careful_bot,
+}
+
+
+# ==================================================================================
+# Simulation
+# ==================================================================================
+
+
+def play_round(difficulty, seed, bot, max_ticks=MAX_TICKS):
+    """Play one round to the end. Returns (score, ticks, cause of death)."""
+    model = GameModel(difficulty, seed=seed)
+    rng = random.Random(seed ^ 0x5EED)
+    think = BOTS[bot]
+
+    while model.alive and model.ticks < max_ticks:
+        direction = think(model, rng)
+        if model.reverse_controls:
+            direction = opposite_direction(direction)
+        model.step(direction)
+
+    cause = model.death_cause if not model.alive else "timeout"
+    return model.score, model.ticks, cause
+
+
+def apply_overrides(overrides):
+    """Apply "Difficulty.key=value" settings in this process."""
+    for difficulty, key, value in overrides:
+        DIFFICULTY_SETTINGS[difficulty][key] = value
+
+
+def play_chunk(difficulty, seeds, bot, max_ticks, overrides):
+    apply_overrides(overrides)
+    return [play_round(difficulty, seed, bot, max_ticks) for seed in seeds]
+
+
+def simulate(difficulty, games, bot="greedy", seed=0, max_ticks=MAX_TICKS,
+             overrides=(), workers=None):
+    """
+    Play `games` rounds of one difficulty over a process pool.
+    Seeds run from `seed` upwards, so the same arguments give the same results.
+    """
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i:i + CHUNK_SIZE] for i in range(0, games, CHUNK_SIZE)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_chunk, difficulty, chunk, bot, max_ticks, list(overrides))
+                   for chunk in chunks]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+# ==================================================================================
+# Report
+# ==================================================================================
+
+
+def describe(values):
+    """min / p10 / median / p90 / max and the mean of a list of numbers."""
+    values = sorted(values)
+    if len(values) > 1:
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+        p10, p90 = deciles[0], deciles[-1]
+    else:
+        p10 = p90 = values[0]
+    return (f"mean {statistics.fmean(values):8.1f}  min {values[0]:6}  p10 {p10:8.1f}  "
+            f"median {statistics.median(values):8.1f}  p90 {p90:8.1f}  max {values[-1]:6}")
+
+
+def histogram(values, bins=10, width=40):
+    low, high = min(values), max(values)
+    size = max(1, -(-(high - low + 1) // bins))   # ceil, at least one value per bin
+    counts = Counter((v - low) // size for v in values)
+    peak = max(counts.values())
+    lines = []
+    for b in range((high - low) // size + 1):
+        start = low + b * size
+        bar = "#" * round(counts[b] / peak * width)
+        lines.append(f"    {start:6} - {start + size - 1:<6} {counts[b]:6}  {bar}")
+    return "\n".join(lines)
+
+
+def report(difficulty, results, elapsed):
+    scores = [score for score, _, _ in results]
+    ticks = [t for _, t, _ in results]
+    causes = Counter(cause for _, _, cause in results)
+
+    print(f"=== {difficulty}: {len(results)} games in {elapsed:.1f}s ===")
+    print(f"  Score   {describe(scores)}")
+    print(histogram(scores))
+    print(f"  Ticks   {describe(ticks)}")
+    print("  Death   " + "  ".join(f"{cause} {count / len(results):.1%}"
+                                   for cause, count in causes.most_common()))
+    print()
+
+
+def parse_override(text):
+    """"Hard.spawn_rotten=0.5" -> ("Hard", "spawn_rotten", 0.5)"""
+    try:
+        name, value = text.split("=", 1)
+        difficulty, key = name.split(".", 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected Difficulty.key=value, got '{text}'")
+    if difficulty not in DIFFICULTY_SETTINGS:
+        raise argparse.ArgumentTypeError(f"unknown difficulty '{difficulty}'")
+
+    if value in ("True", "False"):
+        value = value == "True"
+    else:
+        try:
+            value = int(value)
+        except ValueError:
+            value = float(value)
+    return difficulty, key, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Catch That Lemon rounds with a bot.")
+    parser.add_argument("-d", "--difficulty", action="append", choices=list(DIFFICULTY_SETTINGS),
+                        help="difficulty to simulate (repeatable, default: all)")
+    parser.add_argument("-n", "--games", type=int, default=2000, help="games per difficulty")
+    parser.add_argument("--bot", choices=list(BOTS), default="greedy",
+                        help="careful plays longer rounds but is about ten times slower")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        type=parse_override, metavar="DIFFICULTY.KEY=VALUE",
+                        help="override a difficulty setting, e.g. Hard.spawn_rotten=0.5")
+    args = parser.parse_args()
+
+    for difficulty in args.difficulty or list(DIFFICULTY_SETTINGS):
+        start = time.perf_counter()
+        results = simulate(difficulty, args.games, args.bot, args.seed,
+                           args.max_ticks, args.overrides, args.workers)
+        report(difficulty, results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
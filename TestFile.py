@@ -13,38 +13,22 @@ wn = turtle.Screen()
 t = turtle.Turtle()
 t.hideturtle()
 
-def Load_folder(folder):
-    result = {}
-    if not(os.path.isdir(folder)):
-        print(f"Warning: folder '{folder}' not found.")
-        return result
-
-    for filename in os.listdir(folder):
-        if filename.lower().endswith(".gif"):
-            path = os.path.join(folder, filename)
-            wn.addshape(path)
-            key = os.path.splitext(filename)[0]
-            result[key] = path
-            print("Registered Shape:", key, "->", path)
-    return result
+# Only load the GIFs this script shows, not every file in the folders
+ASSETS = {
+    "Options_BG": "backgrounds/Options_BG.gif",
+}
 
-def Load_Gifs_From(folder):
+def Load_Gifs(assets):
     result = {}
-    if not(os.path.isdir(folder)):
-        print(f"Warning: folder '{folder}' not found.")
-        return result
-    for filename in os.listdir(folder):
-        if filename.lower().endswith(".gif"):
-            path = os.path.join(folder, filename)
-            wn.addshape(path)
-            key = os.path.splitext(filename)[0]
-            result[key] = path
-            print("Registered Shape:", key, "->", path)
+    for key, path in assets.items():
+        if not(os.path.isfile(path)):
+            print(f"Warning: file '{path}' not found.")
+            continue
+        result[key] = path
     return result
 
 
-sprites = Load_Gifs_From("sprites")
-backgrounds = Load_Gifs_From("backgrounds")
+backgrounds = Load_Gifs(ASSETS)
 
 #===========================================================
 #GLOBALS
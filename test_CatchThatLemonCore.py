@@ -0,0 +1,151 @@
+"""
+Headless checks for the game rules in CatchThatLemonCore.py.
+
+    python -m unittest test_CatchThatLemonCore
+    python -m pytest test_CatchThatLemonCore.py
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from CatchThatLemonCore import (
+    DIFFICULTY_SETTINGS,
+    DIRECTIONS,
+    INPUT_QUEUE_SIZE,
+    GameModel,
+    board_cells,
+    load_replay,
+    replay_game,
+    save_replay,
+)
+
+
+def random_play(model, rng, max_ticks=2000):
+    """
+    Mash the arrow keys until the round ends, yielding after every tick.
+    Up to two keys land between two ticks, so the turn queue gets used too.
+    """
+    while model.alive and model.ticks < max_ticks:
+        for _ in range(rng.choice((0, 1, 1, 2))):
+            model.turn(rng.choice(list(DIRECTIONS)))
+        model.step()
+        yield model
+
+
+def expected_grid(m):
+    """The occupancy grid worked out from the model's own lists."""
+    grid = {}
+    for cell in m.segments:
+        grid[cell] = "snake"
+    grid[m.head] = "snake"
+    grid[m.food] = "food"
+    for slot, cell in m.items.items():
+        grid[cell] = slot
+    for cell in m.obstacles:
+        grid[cell] = "spike"
+    return grid
+
+
+class GridTest(unittest.TestCase):
+    """The grid and free cells must stay in step with the snake, food, items and spikes."""
+
+    def test_grid_matches_model_during_random_play(self):
+        rng = random.Random(1)
+        for seed, difficulty in enumerate(list(DIFFICULTY_SETTINGS) * 5):
+            m = GameModel(difficulty, seed=seed)
+            for m in random_play(m, rng):
+                if m.alive:
+                    self.assertEqual(dict(m.grid), expected_grid(m), (difficulty, seed, m.ticks))
+
+    def test_free_cells_are_the_cells_missing_from_the_grid(self):
+        rng = random.Random(2)
+        board = set(board_cells())
+        for seed in range(10):
+            m = GameModel("Hard", seed=seed)
+            for m in random_play(m, rng):
+                self.assertEqual(set(m.free.cells), board - set(m.grid), (seed, m.ticks))
+                for cell, i in m.free.index.items():
+                    self.assertEqual(m.free.cells[i], cell)
+
+    def test_full_board_has_no_safe_position(self):
+        m = GameModel("Easy", seed=0)
+        for cell in board_cells():
+            if cell not in m.grid:
+                m.set_cell(cell, "spike")
+        self.assertIsNone(m.random_safe_position())
+
+
+class ReplayTest(unittest.TestCase):
+    """A saved round must replay to the same end, tick for tick."""
+
+    def round_trip(self, m):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "round.ctlr")
+            save_replay(m, path)
+            replay = load_replay(path)
+        self.assertEqual(replay["board_limit"], m.board_limit)
+        return replay_game(replay)
+
+    def test_replay_gives_the_same_result(self):
+        rng = random.Random(3)
+        for seed, difficulty in enumerate(list(DIFFICULTY_SETTINGS) * 10):
+            m = GameModel(difficulty, seed=seed)
+            for m in random_play(m, rng):
+                pass
+            replayed = self.round_trip(m)
+            self.assertEqual((replayed.ticks, replayed.score, replayed.death_cause),
+                             (m.ticks, m.score, m.death_cause), (difficulty, seed))
+
+    def test_replay_keeps_the_board_size(self):
+        rng = random.Random(4)
+        m = GameModel("Hard", seed=7, board_limit=(30, 15))
+        for m in random_play(m, rng):
+            pass
+        replayed = self.round_trip(m)
+        self.assertEqual((replayed.ticks, replayed.score, replayed.death_cause),
+                         (m.ticks, m.score, m.death_cause))
+
+
+class TurnQueueTest(unittest.TestCase):
+    """Quick presses are queued one per tick and can never flip the snake around."""
+
+    def snake_moving_right(self):
+        m = GameModel("Classic", seed=0)
+        m.grow = 3
+        for _ in range(4):
+            m.step("right")
+        self.assertTrue(m.alive)
+        self.assertEqual(len(m.segments), 3)
+        return m
+
+    def test_two_quick_turns_make_a_u_turn_not_a_flip(self):
+        m = self.snake_moving_right()
+        x, y = m.head
+        m.turn("up")
+        m.turn("left")
+        m.step()
+        self.assertEqual((m.direction, m.head), ("up", (x, y + 1)))
+        m.step()
+        self.assertEqual((m.direction, m.head), ("left", (x - 1, y + 1)))
+        self.assertTrue(m.alive)
+
+    def test_turn_back_is_ignored(self):
+        m = self.snake_moving_right()
+        x, y = m.head
+        m.turn("left")
+        m.step()
+        self.assertEqual((m.direction, m.head), ("right", (x + 1, y)))
+        self.assertTrue(m.alive)
+
+    def test_queue_is_bounded(self):
+        m = self.snake_moving_right()
+        for _ in range(INPUT_QUEUE_SIZE + 5):
+            m.turn("up")
+            m.turn("right")
+        self.assertEqual(len(m.turns), INPUT_QUEUE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()